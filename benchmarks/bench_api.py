@@ -0,0 +1,374 @@
+"""Benchmark de carga y latencia de la API (main:app)
+
+Lanza una mezcla configurable de peticiones contra la aplicación FastAPI
+por dos vías:
+
+  asgi      llamadas ASGI dentro del proceso (httpx.ASGITransport), sin
+            red: mide el coste de la aplicación.
+  uvicorn   un servidor `uvicorn main:app` lanzado en local, con HTTP real.
+
+Para cada combinación de vía, tamaño del almacén y concurrencia se parte
+de un almacén nuevo (un subproceso o un servidor por medida) con `--sizes`
+tareas precargadas, se hace un calentamiento y se lanzan `--requests`
+peticiones repartidas entre `--concurrency` clientes. Cada cliente usa un
+generador aleatorio con semilla fija, así que la secuencia de operaciones
+es la misma en cada ejecución.
+
+Operaciones de la mezcla (`--mix`, pesos relativos):
+
+  list    GET /tasks/?limit=50&cursor=<id>
+  get     GET /tasks/{id}
+  create  POST /tasks/
+  put     PUT /tasks/{id}
+  patch   PATCH /tasks/{id}
+  delete  DELETE /tasks/{id}
+
+Informa peticiones/segundo y latencias p50/p95/p99 (ms) por operación y
+en total. Con `--output` guarda los resultados en JSON; con `--baseline`
+los compara con un JSON anterior y termina con código 1 si alguna medida
+empeora más de `--tolerance` (rendimiento menor o p95/p99 mayores).
+
+Las variables TASKS_* del entorno (TASKS_BACKEND, TASKS_STORE, ...) se
+pasan a la aplicación, así que se pueden comparar backends.
+
+Uso (desde la raíz del proyecto; requiere httpx y, para `uvicorn`, uvicorn):
+  python -m benchmarks.bench_api [--transports asgi uvicorn]
+      [--sizes 1000 100000] [--concurrency 1 16 64] [--requests 5000]
+      [--mix list=10,get=60,create=10,put=5,patch=10,delete=5]
+      [--output resultados.json] [--baseline base.json] [--tolerance 0.1]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+OPERATIONS = ("list", "get", "create", "put", "patch", "delete")
+DEFAULT_MIX = "list=10,get=60,create=10,put=5,patch=10,delete=5"
+# Como mucho TASKS_BULK_MAX (1000 por defecto) por petición
+_SEED_BATCH = 1000
+
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"operación desconocida: {name!r}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"peso no válido: {part!r}") from None
+    if sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("la mezcla no tiene ningún peso positivo")
+    return mix
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    # Rango más cercano sobre la lista ya ordenada
+    if not values:
+        return 0.0
+    # El menor valor que deja al menos `pct`% de la muestra por debajo o igual
+    k = max(0, min(len(values) - 1, math.ceil(pct * len(values) / 100) - 1))
+    return values[k]
+
+
+def _summary(latencies: List[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+    }
+
+
+# ---------------------------------------------------------
+# Generación de carga
+# ---------------------------------------------------------
+
+async def _request(client: httpx.AsyncClient, op: str, ids: list, rng) -> int:
+    if op == "list":
+        cursor = rng.choice(ids) if ids else 0
+        resp = await client.get("/tasks/", params={"limit": 50, "cursor": cursor})
+    elif op == "create":
+        resp = await client.post("/tasks/", json={"title": "carga", "done": False})
+        if resp.status_code == 201:
+            ids.append(resp.json()["id"])
+    elif not ids:
+        # Sin tareas no hay id sobre el que operar: se crea una
+        return await _request(client, "create", ids, rng)
+    elif op == "get":
+        resp = await client.get(f"/tasks/{rng.choice(ids)}")
+    elif op == "put":
+        resp = await client.put(f"/tasks/{rng.choice(ids)}",
+                                json={"title": "reemplazada", "done": True})
+    elif op == "patch":
+        resp = await client.patch(f"/tasks/{rng.choice(ids)}",
+                                  json={"done": rng.random() < 0.5})
+    else:
+        # Se saca el id de la lista para que las demás operaciones no lo usen
+        i = rng.randrange(len(ids))
+        ids[i], ids[-1] = ids[-1], ids[i]
+        resp = await client.delete(f"/tasks/{ids.pop()}")
+    return resp.status_code
+
+
+async def _client(client, ops: List[str], ids: list, rng, record) -> None:
+    for op in ops:
+        start = time.perf_counter()
+        code = await _request(client, op, ids, rng)
+        record(op, time.perf_counter() - start, code)
+
+
+async def _drive(client: httpx.AsyncClient, config: dict) -> dict:
+    # Precarga del almacén por lotes
+    ids: list = []
+    for first in range(0, config["size"], _SEED_BATCH):
+        n = min(_SEED_BATCH, config["size"] - first)
+        resp = await client.post(
+            "/tasks/bulk", json=[{"title": f"tarea {first + i}"} for i in range(n)]
+        )
+        resp.raise_for_status()
+        ids.extend(t["id"] for t in resp.json())
+
+    names = list(config["mix"])
+    weights = [config["mix"][n] for n in names]
+    concurrency = config["concurrency"]
+    # Las operaciones de cada cliente se sortean antes de empezar, con su
+    # propio generador, para que no dependan del orden en que se intercalan
+    plan_rng = random.Random(config["seed"])
+    rngs = [random.Random(config["seed"] * 1000 + i) for i in range(concurrency)]
+
+    def plan(total: int) -> List[List[str]]:
+        per_client = -(-total // concurrency)
+        return [plan_rng.choices(names, weights, k=per_client) for _ in rngs]
+
+    warmup, measured = plan(config["warmup"]), plan(config["requests"])
+
+    latencies: Dict[str, List[float]] = {op: [] for op in names}
+    errors: Dict[str, int] = {op: 0 for op in names}
+
+    def record(op, seconds, code):
+        latencies[op].append(seconds)
+        if code >= 500:
+            errors[op] += 1
+
+    def ignore(op, seconds, code):
+        pass
+
+    # Calentamiento (no se mide)
+    await asyncio.gather(*(
+        _client(client, ops, ids, rng, ignore)
+        for ops, rng in zip(warmup, rngs)
+    ))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(client, ops, ids, rng, record)
+        for ops, rng in zip(measured, rngs)
+    ))
+    elapsed = time.perf_counter() - start
+
+    everything = [s for op in names for s in latencies[op]]
+    return {
+        "transport": config["transport"],
+        "size": config["size"],
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "total": _summary(everything, sum(errors.values()), elapsed),
+        "endpoints": {
+            op: _summary(latencies[op], errors[op], elapsed)
+            for op in names if latencies[op]
+        },
+    }
+
+
+# ---------------------------------------------------------
+# Vías de ejecución
+# ---------------------------------------------------------
+
+async def _run_asgi(config: dict) -> dict:
+    from main import app
+
+    limits = httpx.Limits(max_connections=config["concurrency"])
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport no envía los eventos de lifespan: se abren a mano
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://asgi",
+                                     limits=limits) as client:
+            return await _drive(client, config)
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return proc
+        except httpx.TransportError:
+            pass
+        if proc.poll() is not None:
+            break
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn no arrancó a tiempo")
+
+
+async def _drive_url(port: int, config: dict) -> dict:
+    limits = httpx.Limits(max_connections=config["concurrency"])
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}",
+                                 limits=limits) as client:
+        return await _drive(client, config)
+
+
+def _measure(config: dict, port: int) -> dict:
+    if config["transport"] == "uvicorn":
+        proc = _start_server(port)
+        try:
+            return asyncio.run(_drive_url(port, config))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    # En un subproceso para empezar siempre con un almacén vacío
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_api", "--child", json.dumps(config)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out)
+
+
+# ---------------------------------------------------------
+# Comparación con una línea base
+# ---------------------------------------------------------
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Devuelve las medidas que empeoran más de `tolerance` respecto a la
+    línea base (menos peticiones/segundo o percentiles más altos)."""
+    def key(run):
+        return run["transport"], run["size"], run["concurrency"]
+
+    base_runs = {key(run): run for run in baseline["runs"]}
+    regressions = []
+    for run in results["runs"]:
+        base = base_runs.get(key(run))
+        if base is None:
+            continue
+        label = "{}/{}/c{}".format(*key(run))
+        pairs = [("total", run["total"], base["total"])]
+        pairs += [
+            (op, stats, base["endpoints"][op])
+            for op, stats in run["endpoints"].items() if op in base["endpoints"]
+        ]
+        for op, new, old in pairs:
+            if old["rps"] and new["rps"] < old["rps"] * (1 - tolerance):
+                regressions.append(f"{label} {op}: rps {old['rps']} -> {new['rps']}")
+            for metric in ("p95_ms", "p99_ms"):
+                if old[metric] and new[metric] > old[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{label} {op}: {metric} {old[metric]} -> {new[metric]}"
+                    )
+    return regressions
+
+
+def _print_run(run: dict) -> None:
+    print(f"\n{run['transport']}  tareas={run['size']}  "
+          f"concurrencia={run['concurrency']}")
+    print(f"{'operación':>10} {'peticiones':>11} {'req/s':>10} "
+          f"{'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'errores':>8}")
+    rows = list(run["endpoints"].items()) + [("total", run["total"])]
+    for op, s in rows:
+        print(f"{op:>10} {s['count']:>11} {s['rps']:>10.0f} {s['p50_ms']:>9.2f} "
+              f"{s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['errors']:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--transports", nargs="+", choices=["asgi", "uvicorn"],
+                        default=["asgi", "uvicorn"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=5_000,
+                        help="peticiones medidas por combinación")
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix(DEFAULT_MIX))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=3100)
+    parser.add_argument("--output", help="fichero JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="empeoramiento máximo admitido (0.10 = 10%%)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_run_asgi(json.loads(args.child)))))
+        return
+
+    baseline: Optional[dict] = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "env": {k: v for k, v in os.environ.items() if k.startswith("TASKS_")},
+            "mix": args.mix,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        },
+        "runs": [],
+    }
+    for transport in args.transports:
+        for size in args.sizes:
+            for concurrency in args.concurrency:
+                config = {
+                    "transport": transport, "size": size,
+                    "concurrency": concurrency, "requests": args.requests,
+                    "warmup": args.warmup, "mix": args.mix, "seed": args.seed,
+                }
+                run = _measure(config, args.port)
+                results["runs"].append(run)
+                _print_run(run)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados guardados en {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESIÓN (tolerancia {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nOK: sin regresiones respecto a {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark del feed de cambios con muchos clientes en espera
+
+Para cada número de clientes (corrutinas esperando en `ChangeFeed.wait`,
+como hace GET /tasks/changes) mide:
+
+  - memoria (RSS) por cliente en espera;
+  - tiempo desde que un hilo publica un cambio hasta que todos los
+    clientes lo han recibido (reparto);
+  - que la memoria del buffer no crece al publicar muchos más cambios de
+    los que caben.
+
+Uso (desde la raíz del proyecto):
+  python -m benchmarks.bench_changes [--subscribers 1000 10000]
+      [--rounds 20] [--capacity 10000]
+"""
+
+import argparse
+import asyncio
+import gc
+import threading
+import time
+
+from benchmarks.bench_memory import _rss
+from models.tasks_changes import ChangeFeed
+
+
+async def _subscriber(feed: ChangeFeed, since: str, rounds: int, received: list) -> None:
+    for _ in range(rounds):
+        batch = await feed.wait(since, timeout=60)
+        since = batch.next
+        received[0] += 1
+
+
+def _publish_from_thread(feed: ChangeFeed, task_id: int) -> None:
+    # Como en la API: las escrituras llegan desde un hilo del pool
+    t = threading.Thread(target=feed.publish, args=("update", task_id, None))
+    t.start()
+    t.join()
+
+
+async def run(subscribers: int, rounds: int, capacity: int) -> dict:
+    feed = ChangeFeed(capacity, lambda task: b"{}")
+    received = [0]
+
+    gc.collect()
+    before = _rss()
+    tasks = [
+        asyncio.create_task(_subscriber(feed, feed.cursor(0), rounds, received))
+        for _ in range(subscribers)
+    ]
+    while feed.waiting < subscribers:
+        await asyncio.sleep(0.01)
+    per_subscriber = (_rss() - before) / subscribers
+
+    latencies = []
+    for i in range(rounds):
+        target = (i + 1) * subscribers
+        start = time.perf_counter()
+        _publish_from_thread(feed, i)
+        while received[0] < target:
+            await asyncio.sleep(0)
+        latencies.append(time.perf_counter() - start)
+        # Que todos vuelvan a esperar antes del siguiente cambio
+        while feed.waiting < subscribers and i < rounds - 1:
+            await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    # Buffer acotado: publicar 10x su capacidad no aumenta la memoria
+    for i in range(capacity):
+        feed.publish("update", i, None)
+    gc.collect()
+    filled = _rss()
+    for i in range(capacity * 10):
+        feed.publish("update", i, None)
+    gc.collect()
+    growth = _rss() - filled
+
+    latencies.sort()
+    return {
+        "subscribers": subscribers,
+        "bytes_per_subscriber": per_subscriber,
+        "fanout_p50_ms": latencies[len(latencies) // 2] * 1000,
+        "fanout_max_ms": latencies[-1] * 1000,
+        "per_subscriber_us": latencies[len(latencies) // 2] / subscribers * 1e6,
+        "buffer_growth_kb": growth / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--capacity", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'clientes':>9} {'bytes/cliente':>14} {'reparto p50 (ms)':>17} "
+          f"{'máx (ms)':>9} {'µs/cliente':>11} {'buffer +KB':>11}")
+    for n in args.subscribers:
+        r = asyncio.run(run(n, args.rounds, args.capacity))
+        print(f"{r['subscribers']:>9} {r['bytes_per_subscriber']:>14.0f} "
+              f"{r['fanout_p50_ms']:>17.2f} {r['fanout_max_ms']:>9.2f} "
+              f"{r['per_subscriber_us']:>11.2f} {r['buffer_growth_kb']:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
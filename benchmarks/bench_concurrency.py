@@ -0,0 +1,99 @@
+"""Prueba de estrés multihilo del almacén de tareas
+
+Cada hilo crea tareas, las modifica con PATCH, lee listados y páginas y
+elimina la mitad de las que creó, mientras los demás hilos hacen lo mismo.
+Al terminar se comprueba que:
+
+  - no hay ids duplicados ni tareas perdidas,
+  - cada tarea superviviente tiene el último valor escrito por su hilo,
+  - los índices secundarios coinciden con el contenido del almacén.
+
+Informa el rendimiento (operaciones por segundo) según el número de hilos.
+
+Uso (desde la raíz del proyecto):
+  python -m benchmarks.bench_concurrency [--threads 1 2 4 8] [--ops 5000]
+      [--layout indexed|columnar]
+"""
+
+import argparse
+import threading
+import time
+
+from models.tasks_model import Task
+from models.tasks_columnar import ColumnarTaskStore
+from models.tasks_store import BaseTaskStore, TaskStore
+
+LAYOUTS = {"indexed": TaskStore, "columnar": ColumnarTaskStore}
+
+
+def _worker(store: BaseTaskStore, n_ops: int, created: list, barrier) -> None:
+    barrier.wait()
+    mine = []
+    for i in range(n_ops):
+        task = store.add(f"tarea {threading.get_ident()} {i}")
+        mine.append(task.id)
+        store.update(task.id, done=True)
+        store.update(task.id, title=f"final {task.id}")
+        if i % 50 == 0:
+            store.all()
+        store.query(task.id - 10, 20, done=False)
+    for task_id in mine[::2]:
+        store.remove(task_id)
+    created.extend(mine)
+
+
+def run(n_threads: int, n_ops: int, layout: str = "indexed") -> dict:
+    store = LAYOUTS[layout](Task)
+    created: list = []
+    barrier = threading.Barrier(n_threads + 1)
+    threads = [
+        threading.Thread(target=_worker, args=(store, n_ops, created, barrier))
+        for _ in range(n_threads)
+    ]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    expected = n_threads * n_ops
+    assert len(created) == expected, "faltan tareas creadas"
+    assert len(set(created)) == expected, "ids duplicados"
+
+    survivors = store.all()
+    assert len(survivors) == expected - n_threads * ((n_ops + 1) // 2), \
+        "eliminaciones perdidas"
+    for task in survivors:
+        assert task.done and task.title == f"final {task.id}", \
+            f"actualización perdida en la tarea {task.id}"
+
+    pending, _ = store.query(done=False)
+    finished, _ = store.query(done=True)
+    assert not pending and len(finished) == len(survivors), "índices desfasados"
+
+    # Por tarea: add + 2 update + query (+ remove para la mitad)
+    ops = expected * 4 + expected // 2
+    return {"threads": n_threads, "ops": ops, "ops_per_s": ops / elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ops", type=int, default=5_000,
+                        help="tareas creadas por hilo")
+    parser.add_argument("--layout", choices=LAYOUTS, default="indexed")
+    args = parser.parse_args()
+
+    print(f"{'hilos':>6} {'operaciones':>12} {'ops/s':>12}")
+    for n in args.threads:
+        r = run(n, args.ops, args.layout)
+        print(f"{r['threads']:>6} {r['ops']:>12} {r['ops_per_s']:>12.0f}")
+    print("OK: sin ids duplicados ni actualizaciones perdidas")
+
+
+if __name__ == "__main__":
+    main()
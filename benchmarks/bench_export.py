@@ -0,0 +1,133 @@
+"""Benchmark de memoria de la exportación de tareas
+
+Compara el pico de memoria (RSS) al serializar todas las tareas:
+
+  - full:   como `GET /tasks/` (lista completa validada y serializada en un
+            único cuerpo).
+  - stream: como `GET /tasks/export` (NDJSON generado por bloques).
+
+Cada modo se ejecuta en un proceso aparte para que el pico de uno no
+contamine al otro. Se informa el incremento de RSS sobre el almacén ya
+cargado y el tiempo hasta el primer bloque. El modo stream falla (código
+de salida distinto de cero) si su pico supera un múltiplo fijo de
+`--chunk-size`.
+
+Uso (desde la raíz del proyecto):
+  python -m benchmarks.bench_export [--tasks 1000000] [--chunk-size 1000]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+
+from models.tasks_model import Task, TaskCreate, create_task, get_all_tasks
+from services.tasks_service import service_export_tasks
+
+
+# Límite del pico de RSS en modo stream: un múltiplo fijo de `chunk_size`
+# (el JSON de cada tarea ronda los 60 bytes y se copia un par de veces al
+# unir el bloque) más un margen por el redondeo a páginas del asignador
+STREAM_BYTES_PER_TASK = 1024
+STREAM_SLACK_BYTES = 2 * 2**20
+
+
+def _status_mb(field: str) -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise KeyError(field)
+
+
+def _reset_peak_rss() -> float:
+    """Pone a cero el pico de RSS del proceso y devuelve el RSS actual.
+
+    `ru_maxrss` no se puede reiniciar y el pico de la carga del almacén
+    ocultaría el de la exportación; en Linux, escribir "5" en
+    /proc/self/clear_refs reinicia `VmHWM`.
+    """
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    return _status_mb("VmRSS")
+
+
+def _peak_rss_mb() -> float:
+    return _status_mb("VmHWM")
+
+
+def run(mode: str, n_tasks: int, chunk_size: int) -> dict:
+    for i in range(n_tasks):
+        create_task(TaskCreate(title=f"tarea número {i}", done=i % 2 == 0))
+    # CPython guarda junto a cada str no ASCII su copia en UTF-8 la primera
+    # vez que se serializa. Es memoria del almacén (una vez por título), no
+    # de la exportación, así que se paga antes de medir en ambos modos
+    for _ in service_export_tasks(chunk_size=chunk_size):
+        pass
+    base = _reset_peak_rss()
+
+    start = time.perf_counter()
+    first_byte = None
+    total = 0
+    if mode == "full":
+        body = TypeAdapter(List[Task]).dump_json(get_all_tasks())
+        first_byte = time.perf_counter() - start
+        total = len(body)
+        del body
+    else:
+        for chunk in service_export_tasks(chunk_size=chunk_size):
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            total += len(chunk)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "tasks": n_tasks,
+        "bytes": total,
+        "peak_rss_increase_mb": round(_peak_rss_mb() - base, 1),
+        "time_to_first_byte_s": round(first_byte or 0.0, 4),
+        "total_s": round(elapsed, 3),
+    }
+
+
+def _check_stream(result: dict, chunk_size: int) -> None:
+    # La exportación por bloques solo retiene un bloque a la vez: su pico no
+    # puede depender del número de tareas, solo de `chunk_size`
+    bound = (chunk_size * STREAM_BYTES_PER_TASK + STREAM_SLACK_BYTES) / 2**20
+    if result["peak_rss_increase_mb"] > bound:
+        sys.exit(
+            f"stream: el pico de RSS ({result['peak_rss_increase_mb']} MB) supera "
+            f"el límite de {bound:.1f} MB para bloques de {chunk_size} tareas"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--mode", choices=["full", "stream"])
+    args = parser.parse_args()
+
+    for mode in [args.mode] if args.mode else ["full", "stream"]:
+        if args.mode:
+            result = run(mode, args.tasks, args.chunk_size)
+        else:
+            result = json.loads(subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_export", "--mode", mode,
+                 "--tasks", str(args.tasks), "--chunk-size", str(args.chunk_size)],
+                check=True, capture_output=True, text=True,
+            ).stdout)
+        print(json.dumps(result))
+        if mode == "stream":
+            _check_stream(result, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
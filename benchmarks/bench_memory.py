@@ -0,0 +1,119 @@
+"""Benchmark de memoria: bytes por tarea según la disposición del almacén
+
+Compara tres disposiciones con el mismo contenido:
+
+  models     lista de objetos Task (la disposición original)
+  indexed    TaskStore: un Task por tarea más los índices secundarios
+  columnar   ColumnarTaskStore: columnas contiguas (TASKS_STORE=columnar)
+
+Cada medida se hace en un subproceso nuevo, restando la memoria residente
+(RSS) antes y después de cargar las tareas, para que las medidas no se
+contaminen entre sí. Con 10M tareas las disposiciones con un objeto por
+tarea necesitan varios GB; usar --layouts para medir solo algunas.
+
+Uso (desde la raíz del proyecto):
+  python -m benchmarks.bench_memory [--sizes 1000000 10000000]
+      [--layouts models indexed columnar]
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+from itertools import islice
+
+LAYOUTS = ("models", "indexed", "columnar")
+
+
+def _rss() -> int:
+    """Memoria residente actual en bytes (Linux); si no, el máximo."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # ru_maxrss viene en KB en Linux y en bytes en macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _items(size: int):
+    return ((f"tarea número {i}", i % 3 == 0) for i in range(size))
+
+
+def _fill(store, size: int, batch: int = 10_000) -> None:
+    # Por lotes, para que la lista temporal de `add_many` no infle el RSS
+    items = _items(size)
+    for _ in range(0, size, batch):
+        store.add_many(islice(items, batch))
+
+
+def _measure(layout: str, size: int) -> dict:
+    from models.tasks_model import Task
+    from models.tasks_columnar import ColumnarTaskStore
+    from models.tasks_store import TaskStore
+
+    gc.collect()
+    before = _rss()
+    extra = {}
+    if layout == "models":
+        data = [
+            Task(id=i, title=title, done=done)
+            for i, (title, done) in enumerate(_items(size), 1)
+        ]
+    elif layout == "indexed":
+        data = TaskStore(Task)
+        _fill(data, size)
+    else:
+        data = ColumnarTaskStore(Task)
+        _fill(data, size)
+        extra["column_bytes"] = data.memory_usage()
+    gc.collect()
+    used = _rss() - before
+
+    assert len(data) == size
+    return {"layout": layout, "size": size, "bytes": used,
+            "bytes_per_task": used / size, **extra}
+
+
+def _run_child(layout: str, size: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_memory", "--child", layout, str(size)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=list(LAYOUTS))
+    parser.add_argument("--child", nargs=2, metavar=("LAYOUT", "SIZE"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_measure(args.child[0], int(args.child[1]))))
+        return
+
+    print(f"{'tareas':>10} {'disposición':>12} {'MB':>10} {'bytes/tarea':>12}")
+    for size in args.sizes:
+        for layout in args.layouts:
+            try:
+                r = _run_child(layout, size)
+            except subprocess.CalledProcessError as exc:
+                # Normalmente falta de memoria con los tamaños grandes
+                print(f"{size:>10} {layout:>12} {'error':>10} "
+                      f"(código {exc.returncode})")
+                continue
+            print(f"{r['size']:>10} {r['layout']:>12} {r['bytes'] / 2**20:>10.1f} "
+                  f"{r['bytes_per_task']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark del coste de las métricas (/metrics)
+
+Dos medidas:
+
+  - Primitivas: nanosegundos por `Counter.inc` y `Histogram.observe`, que
+    se ejecutan varias veces en cada petición.
+  - Camino caliente: la misma carga de benchmarks/bench_api.py con
+    TASKS_METRICS=0 (sin middleware, sin tiempos del backend) y con
+    TASKS_METRICS=1, comparando peticiones/segundo y latencias.
+
+Uso (desde la raíz del proyecto; requiere httpx y, para `uvicorn`, uvicorn):
+  python -m benchmarks.bench_metrics [--transports asgi] [--size 10000]
+      [--concurrency 1 16] [--requests 20000]
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.bench_api import DEFAULT_MIX, _measure, _parse_mix
+
+
+def _ns_per_call(fn, n: int = 200_000) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def bench_primitives() -> dict:
+    from services.metrics import Counter, Histogram
+
+    counter = Counter("c", "c", ("method", "route", "status"))
+    histogram = Histogram("h", "h", ("method", "route"))
+    return {
+        "counter_inc_ns": _ns_per_call(lambda: counter.inc("GET", "/tasks/{id}", 200)),
+        "histogram_observe_ns": _ns_per_call(
+            lambda: histogram.observe(0.0012, "GET", "/tasks/{id}")
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--transports", nargs="+", choices=["asgi", "uvicorn"],
+                        default=["asgi"])
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--warmup", type=int, default=1_000)
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix(DEFAULT_MIX))
+    parser.add_argument("--port", type=int, default=3100)
+    args = parser.parse_args()
+
+    p = bench_primitives()
+    print(f"Counter.inc:       {p['counter_inc_ns']:>7.0f} ns")
+    print(f"Histogram.observe: {p['histogram_observe_ns']:>7.0f} ns\n")
+
+    print(f"{'vía':>8} {'concurrencia':>12} {'métricas':>9} {'req/s':>10} "
+          f"{'p50 (ms)':>9} {'p99 (ms)':>9} {'coste':>8}")
+    for transport in args.transports:
+        for concurrency in args.concurrency:
+            config = {
+                "transport": transport, "size": args.size,
+                "concurrency": concurrency, "requests": args.requests,
+                "warmup": args.warmup, "mix": args.mix, "seed": 0,
+            }
+            totals = {}
+            for enabled in ("0", "1"):
+                # Los subprocesos (hijo ASGI o uvicorn) heredan el entorno
+                os.environ["TASKS_METRICS"] = enabled
+                totals[enabled] = _measure(config, args.port)["total"]
+            for enabled, t in totals.items():
+                overhead = ""
+                if enabled == "1":
+                    overhead = f"{totals['0']['rps'] / t['rps'] - 1:>+8.1%}"
+                print(f"{transport:>8} {concurrency:>12} {'sí' if enabled == '1' else 'no':>9} "
+                      f"{t['rps']:>10.0f} {t['p50_ms']:>9.2f} {t['p99_ms']:>9.2f} {overhead:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark del almacén de tareas
+
+Mide la latencia media por operación (get, update, delete y una página de
+50 tareas pendientes) con almacenes de distintos tamaños. Con los índices
+la latencia debe mantenerse plana aunque el número de tareas crezca de 1k
+a 1M.
+
+Uso (desde la raíz del proyecto):
+  python -m benchmarks.bench_store [--sizes 1000 10000 100000 1000000]
+      [--layout indexed|columnar]
+"""
+
+import argparse
+import random
+import time
+
+from models.tasks_model import Task
+from models.tasks_columnar import ColumnarTaskStore
+from models.tasks_store import TaskStore
+
+LAYOUTS = {"indexed": TaskStore, "columnar": ColumnarTaskStore}
+
+
+def _timeit(fn, ids) -> float:
+    start = time.perf_counter()
+    for task_id in ids:
+        fn(task_id)
+    return (time.perf_counter() - start) / len(ids) * 1e9
+
+
+def bench(size: int, ops: int, layout: str = "indexed") -> dict:
+    store = LAYOUTS[layout](Task)
+    for i in range(size):
+        store.add(f"tarea {i}", i % 2 == 0)
+
+    rng = random.Random(size)
+    ids = rng.sample(range(1, size + 1), min(ops, size))
+
+    return {
+        "size": size,
+        "get_ns": _timeit(store.get, ids),
+        "page_ns": _timeit(lambda i: store.query(i, 50, done=False), ids),
+        "update_ns": _timeit(lambda i: store.update(i, done=True), ids),
+        "delete_ns": _timeit(store.remove, ids),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--ops", type=int, default=1_000)
+    parser.add_argument("--layout", choices=LAYOUTS, default="indexed")
+    args = parser.parse_args()
+
+    print(f"{'tareas':>10} {'get (ns)':>10} {'page (ns)':>10} "
+          f"{'update (ns)':>12} {'delete (ns)':>12}")
+    for size in args.sizes:
+        r = bench(size, args.ops, args.layout)
+        print(f"{r['size']:>10} {r['get_ns']:>10.0f} {r['page_ns']:>10.0f} "
+              f"{r['update_ns']:>12.0f} {r['delete_ns']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark de despliegue multi-worker con el backend SQLite compartido
+
+Lanza `uvicorn main:app --workers N` (N = 1, 2, 4, 8) con
+TASKS_BACKEND=sqlite sobre un fichero temporal y genera carga mixta de
+lectura/escritura desde un cliente asíncrono:
+
+  70% GET /tasks/{id}, 10% GET /tasks?limit=50, 10% POST /tasks,
+  10% PATCH /tasks/{id}
+
+Al final comprueba que una tarea creada es visible desde todos los
+workers (varias lecturas sin errores 404) e informa peticiones/segundo.
+
+Uso (desde la raíz del proyecto; requiere uvicorn y httpx):
+  python -m benchmarks.bench_workers [--workers 1 2 4 8] [--seconds 10]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def _start_server(workers: int, port: int, db_path: str) -> subprocess.Popen:
+    env = dict(os.environ, TASKS_BACKEND="sqlite", TASKS_SQLITE_PATH=db_path)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return proc
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn no arrancó a tiempo")
+
+
+async def _client(client: httpx.AsyncClient, ids: list, stop: float, rng) -> int:
+    done = 0
+    while time.perf_counter() < stop:
+        r = rng.random()
+        if r < 0.7:
+            await client.get(f"/tasks/{rng.choice(ids)}")
+        elif r < 0.8:
+            await client.get("/tasks/", params={"limit": 50, "cursor": rng.choice(ids)})
+        elif r < 0.9:
+            resp = await client.post("/tasks/", json={"title": "carga"})
+            ids.append(resp.json()["id"])
+        else:
+            await client.patch(f"/tasks/{rng.choice(ids)}", json={"done": True})
+        done += 1
+    return done
+
+
+async def _drive(port: int, seconds: float, concurrency: int, seed_tasks: int) -> float:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+        # Por lotes de 1000 (TASKS_BULK_MAX por defecto)
+        ids = []
+        for first in range(0, seed_tasks, 1000):
+            resp = await client.post("/tasks/bulk", json=[
+                {"title": f"tarea {i}"} for i in range(first, min(first + 1000, seed_tasks))
+            ])
+            resp.raise_for_status()
+            ids.extend(t["id"] for t in resp.json())
+
+        stop = time.perf_counter() + seconds
+        counts = await asyncio.gather(*(
+            _client(client, ids, stop, random.Random(i)) for i in range(concurrency)
+        ))
+
+        # Consistencia: una tarea nueva debe verse desde cualquier worker
+        new_id = (await client.post("/tasks/", json={"title": "visible"})).json()["id"]
+        statuses = await asyncio.gather(*(
+            client.get(f"/tasks/{new_id}") for _ in range(concurrency * 4)
+        ))
+        assert all(r.status_code == 200 for r in statuses), "workers inconsistentes"
+    return sum(counts) / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seed-tasks", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=3100)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'req/s':>10}")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            proc = _start_server(workers, args.port, os.path.join(tmp, "tasks.db"))
+            try:
+                rps = asyncio.run(_drive(args.port, args.seconds,
+                                         args.concurrency, args.seed_tasks))
+            finally:
+                proc.terminate()
+                proc.wait()
+        print(f"{workers:>8} {rps:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,24 @@
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from routers.tasks_router import router as tasks_router
 from routers.health_router import router as health_router
+from routers.metrics_router import router as metrics_router
 from fastapi.middleware.cors import CORSMiddleware
+from services.tasks_service import service_open, service_close
+from services import metrics
 
-app = FastAPI(title="API REST  - Tareas")
+
+# Abre el backend de tareas al arrancar y lo cierra al parar (recuperación
+# y volcado a disco si hay persistencia, conexiones si es SQLite)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    service_open()
+    yield
+    service_close()
+
+
+app = FastAPI(title="API REST  - Tareas", lifespan=lifespan)
 
 # Configuración de CORS
 app.add_middleware(
@@ -15,8 +29,15 @@ app.add_middleware(
     allow_headers=["*"],  # Permitir todos los encabezados
 )
 
+# Métricas por ruta (se añade la última para que envuelva a las demás y
+# mida la petición completa); se desactiva con TASKS_METRICS=0
+if metrics.enabled:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 app.include_router(tasks_router)
 app.include_router(health_router)
+if metrics.enabled:
+    app.include_router(metrics_router)
 
 # Prueba de funcionamiento:
 @app.get("/")
@@ -0,0 +1,203 @@
+# Feed de cambios de las tareas (long-poll y SSE)
+
+import asyncio
+import secrets
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, NamedTuple, Optional, Set
+
+
+class ChangeBatch(NamedTuple):
+    events: List["ChangeEvent"]
+    # Cursor para pedir los cambios siguientes (ver `ChangeFeed.cursor`)
+    next: str
+    # True si el cliente se perdió cambios (salieron del buffer o el
+    # servidor se reinició): debe volver a pedir la lista completa
+    reset: bool = False
+
+
+# ---------------------------------------------------------
+# Eventos
+# ---------------------------------------------------------
+#
+# Cada evento se serializa una sola vez, la primera vez que se envía, y se
+# reutiliza para todos los clientes que lo reciban.
+
+class ChangeEvent:
+    __slots__ = ("seq", "op", "id", "task", "_json", "_encode")
+
+    def __init__(self, seq: int, op: str, task_id: int, task, encode):
+        self.seq = seq
+        self.op = op
+        self.id = task_id
+        self.task = task
+        self._json: Optional[bytes] = None
+        self._encode = encode
+
+    def json(self) -> bytes:
+        if self._json is None:
+            task = b"null" if self.task is None else self._encode(self.task)
+            self._json = b'{"seq":%d,"op":"%s","id":%d,"task":%s}' % (
+                self.seq, self.op.encode(), self.id, task
+            )
+        return self._json
+
+
+# ---------------------------------------------------------
+# Buffer circular de cambios
+# ---------------------------------------------------------
+#
+# Se suscribe al almacén (`store.subscribe(feed.publish)`), así que recibe
+# los cambios en orden y con el cerrojo de escritura tomado. Cada evento
+# recibe un número de secuencia consecutivo y ocupa la posición
+# `seq % capacity` de una lista de tamaño fijo: buscar desde un `since`
+# es O(1) y la memoria no depende del tiempo que lleve funcionando.
+#
+# Los clientes no reciben números de secuencia sueltos sino cursores
+# `"<época>:<seq>"`. La época es aleatoria y distinta en cada arranque: al
+# reiniciar, la secuencia vuelve a empezar, y un cursor anterior al
+# reinicio (o que no se entiende) devuelve `reset` en lugar de saltarse o
+# repetir cambios.
+#
+# Los clientes en espera no tienen cola propia: cada uno es un futuro de
+# asyncio en un conjunto. Una ráfaga de escrituras programa un único aviso
+# en el bucle de eventos, que resuelve todos los futuros de una vez, y cada
+# cliente lee del buffer a partir de su `since`. Un cliente inactivo solo
+# cuesta su corrutina, su futuro y su temporizador.
+
+_OPS = {"create": "created", "update": "updated", "delete": "deleted"}
+
+
+class ChangeFeed:
+    def __init__(self, capacity: int, encode: Callable[[object], bytes]):
+        self.capacity = capacity
+        self.epoch = secrets.token_hex(4)
+        self._encode = encode
+        self._ring: List[Optional[ChangeEvent]] = [None] * capacity
+        self._seq: int = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiters: Set[asyncio.Future] = set()
+        self._wake_pending = False
+        self.waiting: int = 0
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def cursor(self, seq: int) -> str:
+        return f"{self.epoch}:{seq}"
+
+    def _position(self, cursor: str) -> Optional[int]:
+        # Número de secuencia de un cursor de este arranque; `None` si no
+        epoch, _, seq = cursor.partition(":")
+        try:
+            position = int(seq)
+        except ValueError:
+            return None
+        return position if epoch == self.epoch and position >= 0 else None
+
+    @contextmanager
+    def tagging(self, op: str):
+        """Publica las actualizaciones hechas dentro del bloque como `op`
+        (p. ej. "patched") en lugar de "updated"."""
+        self._local.op = op
+        try:
+            yield
+        finally:
+            self._local.op = None
+
+    def publish(self, op: str, task_id: int, task) -> None:
+        if op == "update":
+            op = getattr(self._local, "op", None) or "updated"
+        else:
+            op = _OPS.get(op, op)
+        with self._lock:
+            self._seq += 1
+            self._ring[self._seq % self.capacity] = ChangeEvent(
+                self._seq, op, task_id, task, self._encode
+            )
+            if self._loop is None or self._wake_pending:
+                return
+            self._wake_pending = True
+            loop = self._loop
+        try:
+            loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            # Bucle cerrado: nadie está esperando
+            with self._lock:
+                self._wake_pending = False
+
+    def read(self, since: Optional[str] = None, limit: int = 1000) -> ChangeBatch:
+        """Eventos posteriores al cursor `since` (como mucho `limit`). Sin
+        `since` se empieza desde el último cambio."""
+        position = None if since is None else self._position(since)
+        with self._lock:
+            last = self._seq
+            if since is None:
+                return ChangeBatch([], self.cursor(last))
+            oldest = max(1, last - self.capacity + 1)
+            if position is None or position > last or position < oldest - 1:
+                return ChangeBatch([], self.cursor(last), reset=True)
+            end = min(last, position + limit)
+            ring, capacity = self._ring, self.capacity
+            events = [ring[seq % capacity] for seq in range(position + 1, end + 1)]
+        return ChangeBatch(events, self.cursor(end))
+
+    async def wait(
+        self,
+        since: Optional[str] = None,
+        timeout: float = 30.0,
+        limit: int = 1000,
+    ) -> ChangeBatch:
+        """Como `read`, pero si no hay eventos espera hasta `timeout`
+        segundos a que llegue alguno."""
+        batch = self.read(since, limit)
+        if batch.events or batch.reset or timeout <= 0:
+            return batch
+
+        since = batch.next
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        self.waiting += 1
+        try:
+            while True:
+                # Se registra antes de volver a leer para no perder un
+                # cambio publicado entre la lectura y la espera
+                waiter = self._waiter(loop)
+                batch = self.read(since, limit)
+                remaining = deadline - loop.time()
+                if batch.events or batch.reset or remaining <= 0:
+                    self._waiters.discard(waiter)
+                    return batch
+                timer = loop.call_later(remaining, _release, waiter)
+                try:
+                    await waiter
+                finally:
+                    timer.cancel()
+                    self._waiters.discard(waiter)
+        finally:
+            self.waiting -= 1
+
+    def _waiter(self, loop: asyncio.AbstractEventLoop) -> asyncio.Future:
+        waiter = loop.create_future()
+        with self._lock:
+            if self._loop is not loop:
+                # Primer cliente, o un bucle nuevo (p. ej. tras reiniciar la app)
+                self._loop, self._waiters, self._wake_pending = loop, set(), False
+            self._waiters.add(waiter)
+        return waiter
+
+    def _wake(self) -> None:
+        # En el bucle de eventos: despierta a todos los clientes de una vez
+        with self._lock:
+            self._wake_pending = False
+            waiters, self._waiters = self._waiters, set()
+        for waiter in waiters:
+            _release(waiter)
+
+
+def _release(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
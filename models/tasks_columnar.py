@@ -0,0 +1,312 @@
+# Almacén en memoria compacto (por columnas)
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from models.tasks_store import _STAGE_BATCH, BaseTaskStore
+
+
+# ---------------------------------------------------------
+# Disposición por columnas
+# ---------------------------------------------------------
+#
+# En lugar de un objeto Pydantic por tarea (cientos de bytes con su
+# `__dict__` y estado de validación), cada fila ocupa unas pocas columnas
+# contiguas:
+#
+#   ids       array('q')   id de cada fila, en orden creciente
+#   flags     bytearray    0 = pendiente, 1 = hecha, 2 = eliminada
+#   spans     array('q')   (offset << 24) | longitud del título en `titles`
+#   versions  array('q')   versión de la última modificación
+#   titles    bytearray    títulos en UTF-8, uno detrás de otro
+#
+# Offset y longitud van en una sola palabra para que un lector sin cerrojo
+# nunca combine el offset de un título con la longitud de otro. Los títulos
+# repetidos recientemente comparten bytes en `titles`; `span_refs` cuenta
+# cuántas filas más usan cada título compartido, y sus bytes solo quedan
+# muertos cuando los suelta la última.
+#
+# - Buscar por id es una búsqueda binaria en `ids` (O(log n)).
+# - Eliminar marca la fila; renombrar añade el título nuevo al final. Cuando
+#   las filas o bytes muertos superan a los vivos se compacta todo.
+# - Las tareas (`Task`) se construyen solo al devolverlas a la API, y fuera
+#   de la lectura optimista: dentro solo se copian filas en bruto, así una
+#   lectura larga no se repite indefinidamente mientras hay escrituras.
+# - No hay índices secundarios (ocuparían más que los propios datos): el
+#   filtro `done` salta de fila en fila con `bytearray.find`, y los filtros
+#   de título recorren las filas a partir del cursor.
+#
+# Se activa con TASKS_STORE=columnar (ver models/tasks_model.py).
+
+_DELETED = 2
+_LEN_BITS = 24
+_LEN_MASK = (1 << _LEN_BITS) - 1
+_INTERN_SIZE = 4096
+
+
+class ColumnarTaskStore(BaseTaskStore):
+    def __init__(self, factory: Callable[..., object]):
+        super().__init__(factory)
+        self._reset()
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __contains__(self, task_id: int) -> bool:
+        return self._row(task_id) >= 0
+
+    def _insert(self, items):
+        # Las filas se añaden siempre en orden creciente de id
+        if len(items) < _STAGE_BATCH:
+            created = []
+            with self._publishing():
+                for title, done in items:
+                    self._current_id += 1
+                    row = self._append(self._current_id, title, done, self._bump())
+                    task = self._task(row)
+                    self._notify("create", task.id, task)
+                    created.append(task)
+            return created
+
+        # Lote grande: los títulos van al final de `titles`, donde no apunta
+        # ninguna fila publicada, y las filas se preparan en columnas aparte;
+        # publicarlas son unos pocos `extend`.
+        n = len(items)
+        first_id = self._current_id + 1
+        first_version = self._version + 1
+        ids = array("q", range(first_id, first_id + n))
+        flags = bytearray(1 if done else 0 for _, done in items)
+        spans = array("q", [self._store_title(title) for title, _ in items])
+        versions = array("q", range(first_version, first_version + n))
+        created = [
+            self._build(task_id, title, flag)
+            for task_id, (title, _), flag in zip(ids, items, flags)
+        ]
+        for task in created:
+            self._notify("create", task.id, task)
+
+        with self._publishing():
+            self._ids.extend(ids)
+            self._flags.extend(flags)
+            self._spans.extend(spans)
+            self._versions.extend(versions)
+            self._live += n
+            self._current_id = first_id + n - 1
+            self._version = first_version + n - 1
+        return created
+
+    def clear(self) -> None:
+        with self._id_lock, self._writing():
+            self._reset()
+            self._current_id = 0
+            self._bump()
+
+    def load(self, tasks: Iterable[Tuple[int, str, bool]], current_id: int = 0) -> None:
+        """Sustituye el contenido por `(id, title, done)` sin notificar a
+        los suscriptores (por ejemplo, al recuperar desde disco)."""
+        with self._id_lock, self._writing():
+            self._reset()
+            version = self._bump()
+            for task_id, title, done in sorted(tasks):
+                self._append(task_id, title, done, version)
+            last_id = self._ids[-1] if self._ids else 0
+            self._current_id = max(current_id, last_id)
+
+    def all(self) -> List[object]:
+        ids, flags, spans, titles = self._read(
+            lambda: (self._ids[:], self._flags[:], self._spans[:], self._titles[:])
+        )
+        return [
+            self._build(ids[row], self._decode(titles, spans[row]), flags[row])
+            for row in range(len(flags)) if flags[row] != _DELETED
+        ]
+
+    def get_versioned(self, task_id: int) -> Tuple[Optional[object], int]:
+        row, version = self._read(lambda: self._get_row(task_id))
+        if row is None:
+            return None, 0
+        return self._build(*row), version
+
+    def query(
+        self,
+        after: int = 0,
+        limit: Optional[int] = None,
+        done: Optional[bool] = None,
+        prefix: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> Tuple[List[object], Optional[int]]:
+        rows, cursor = self._read(
+            lambda: self._query_rows(after, limit, done, prefix, search)
+        )
+        return [self._build(*row) for row in rows], cursor
+
+    def memory_usage(self) -> int:
+        """Bytes ocupados por las columnas (sin contar el objeto)."""
+        return sum(
+            col.buffer_info()[1] * col.itemsize if isinstance(col, array) else len(col)
+            for col in (self._ids, self._flags, self._spans, self._versions, self._titles)
+        )
+
+    # -----------------------------------------------------
+    # Lectura de filas
+    # -----------------------------------------------------
+
+    def _row(self, task_id: int) -> int:
+        ids = self._ids
+        row = bisect_left(ids, task_id)
+        if row < len(ids) and ids[row] == task_id and self._flags[row] != _DELETED:
+            return row
+        return -1
+
+    @staticmethod
+    def _decode(titles: bytearray, span: int) -> str:
+        start = span >> _LEN_BITS
+        return titles[start:start + (span & _LEN_MASK)].decode()
+
+    def _title(self, row: int) -> str:
+        return self._decode(self._titles, self._spans[row])
+
+    def _build(self, task_id: int, title: str, flag: int) -> object:
+        return self._factory(id=task_id, title=title, done=flag == 1)
+
+    def _task(self, row: int) -> object:
+        return self._build(self._ids[row], self._title(row), self._flags[row])
+
+    def _all(self):
+        # Solo se usa con las escrituras detenidas (`checkpoint`)
+        flags = self._flags
+        return [self._task(row) for row in range(len(flags)) if flags[row] != _DELETED]
+
+    def _get_row(self, task_id):
+        row = self._row(task_id)
+        if row < 0:
+            return None, 0
+        return (task_id, self._title(row), self._flags[row]), self._versions[row]
+
+    def _query_rows(self, after, limit, done, prefix, search):
+        flags = self._flags
+        n = len(flags)
+        row = bisect_right(self._ids, after)
+        target = None if done is None else (b"\x01" if done else b"\x00")
+        prefix = prefix.casefold() if prefix else None
+        search = search.casefold() if search else None
+
+        page = []
+        while row < n:
+            if target is not None:
+                row = flags.find(target, row)
+                if row < 0:
+                    break
+            elif flags[row] == _DELETED:
+                row += 1
+                continue
+
+            title = self._title(row)
+            if prefix or search:
+                key = title.casefold()
+                if (prefix and not key.startswith(prefix)) or (search and search not in key):
+                    row += 1
+                    continue
+
+            if limit is not None and len(page) == limit:
+                return page, page[-1][0]
+            page.append((self._ids[row], title, flags[row]))
+            row += 1
+        return page, None
+
+    # -----------------------------------------------------
+    # Escrituras (requieren el cerrojo de escritura)
+    # -----------------------------------------------------
+
+    def _reset(self) -> None:
+        self._ids = array("q")
+        self._flags = bytearray()
+        self._spans = array("q")
+        self._versions = array("q")
+        self._titles = bytearray()
+        self._intern: Dict[str, int] = {}
+        # span -> filas que lo usan además de la primera
+        self._span_refs: Dict[int, int] = {}
+        self._live = 0
+        self._dead_bytes = 0
+
+    def _store_title(self, title: str) -> int:
+        span = self._intern.get(title)
+        if span is not None:
+            self._span_refs[span] = self._span_refs.get(span, 0) + 1
+            return span
+
+        data = title.encode()
+        if len(data) > _LEN_MASK:
+            raise ValueError("título demasiado largo")
+        span = (len(self._titles) << _LEN_BITS) | len(data)
+        self._titles += data
+        if len(self._intern) >= _INTERN_SIZE:
+            self._intern.clear()
+        self._intern[title] = span
+        return span
+
+    def _release_title(self, span: int) -> None:
+        extra = self._span_refs.get(span)
+        if extra is None:
+            self._dead_bytes += span & _LEN_MASK
+        elif extra == 1:
+            del self._span_refs[span]
+        else:
+            self._span_refs[span] = extra - 1
+
+    def _append(self, task_id: int, title: str, done: bool, version: int) -> int:
+        self._ids.append(task_id)
+        self._flags.append(1 if done else 0)
+        self._spans.append(self._store_title(title))
+        self._versions.append(version)
+        self._live += 1
+        return len(self._ids) - 1
+
+    def _update(self, task_id, title, done):
+        row = self._row(task_id)
+        if row < 0:
+            return None
+
+        if title is not None and title != self._title(row):
+            self._release_title(self._spans[row])
+            self._spans[row] = self._store_title(title)
+        if done is not None:
+            self._flags[row] = 1 if done else 0
+        self._versions[row] = self._bump()
+        task = self._task(row)
+        self._notify("update", task_id, task)
+        self._maybe_compact()
+        return task
+
+    def _remove(self, task_id):
+        row = self._row(task_id)
+        if row < 0:
+            return False
+
+        self._flags[row] = _DELETED
+        self._release_title(self._spans[row])
+        self._live -= 1
+        self._bump()
+        self._notify("delete", task_id, None)
+        self._maybe_compact()
+        return True
+
+    def _maybe_compact(self) -> None:
+        dead_rows = len(self._ids) - self._live
+        if dead_rows > 1024 and dead_rows > self._live \
+                or self._dead_bytes > 65536 and self._dead_bytes > len(self._titles) // 2:
+            self._compact()
+
+    def _compact(self) -> None:
+        # Se construyen columnas nuevas y se publican al final; un lector
+        # que tuviera las antiguas repite la lectura gracias al seqlock.
+        old_ids, old_flags, old_versions = self._ids, self._flags, self._versions
+        rows = [
+            (old_ids[row], self._title(row), old_flags[row], old_versions[row])
+            for row in range(len(old_ids)) if old_flags[row] != _DELETED
+        ]
+        self._reset()
+        for task_id, title, flag, version in rows:
+            self._append(task_id, title, flag == 1, version)
@@ -1,7 +1,10 @@
 # Almacenamiento en memoria para tareas
 
-from typing import List, Optional
+import os
+from typing import List, Optional, Tuple
 from pydantic import BaseModel, Field
+from models.tasks_changes import ChangeFeed
+from models.tasks_store import BaseTaskStore, TaskStore
 
 # ---------------------------------------------------------
 # Modelos de datos (equivalentes a schemas)
@@ -27,6 +30,17 @@ class TaskPatch(BaseModel):
     title: Optional[str] = None
     done: Optional[bool] = None
 
+class TaskBulkPatch(TaskPatch):
+    id: int
+
+
+class BulkResult(BaseModel):
+    id: int
+    status: int
+    task: Optional[Task] = None
+    error: Optional[str] = None
+
+
 class Error(BaseModel):
     error: str
 
@@ -34,70 +48,152 @@ class Error(BaseModel):
         extra = "forbid"
 
 
+class TaskChange(BaseModel):
+    seq: int
+    op: str  # created, updated, patched o deleted
+    id: int
+    task: Optional[Task] = None
+
+
+class TaskChanges(BaseModel):
+    events: List[TaskChange]
+    next: str
+    reset: bool = False
+
+
 # ---------------------------------------------------------
-# Almacenamiento en memoria (no persistente)
+# Almacenamiento en memoria (persistencia opcional)
 # ---------------------------------------------------------
+#
+# Si se define la variable de entorno TASKS_DATA_DIR, `open_storage`
+# recupera las tareas de ese directorio y registra cada cambio en disco
+# (ver models/tasks_persistence.py). Sin ella no se persiste nada.
+#
+# TASKS_STORE elige la disposición en memoria: `indexed` (por defecto, con
+# índices secundarios) o `columnar` (compacta, ver models/tasks_columnar.py).
+
+def _make_store() -> BaseTaskStore:
+    layout = os.environ.get("TASKS_STORE", "indexed")
+    if layout == "indexed":
+        return TaskStore(Task)
+    if layout == "columnar":
+        from models.tasks_columnar import ColumnarTaskStore
+
+        return ColumnarTaskStore(Task)
+    raise ValueError(f"TASKS_STORE desconocido: {layout!r}")
+
+
+store = _make_store()
+persistence = None
+
+# Feed de cambios: los últimos TASKS_CHANGES_SIZE cambios, para que los
+# clientes se sincronicen sin volver a pedir la lista completa (ver
+# models/tasks_changes.py)
+changes = ChangeFeed(
+    int(os.environ.get("TASKS_CHANGES_SIZE", "10000")),
+    lambda task: task.model_dump_json().encode(),
+)
+store.subscribe(changes.publish)
+
+
+def open_storage() -> None:
+    global persistence
+    data_dir = os.environ.get("TASKS_DATA_DIR")
+    if not data_dir or persistence is not None:
+        return
+
+    from models.tasks_persistence import PersistenceEngine
+
+    engine = PersistenceEngine(
+        store,
+        data_dir,
+        fsync=os.environ.get("TASKS_WAL_FSYNC", "batch"),
+        fsync_interval=float(os.environ.get("TASKS_WAL_FSYNC_MS", "10")) / 1000,
+        snapshot_every=int(os.environ.get("TASKS_SNAPSHOT_EVERY", "100000")),
+    )
+    # Solo cuenta como abierta si la recuperación termina: si falla (p. ej.
+    # DataDirLocked), una llamada posterior debe volver a intentarlo
+    engine.open()
+    persistence = engine
 
-tasks: List[Task] = []
-current_id: int = 0
+
+def close_storage() -> None:
+    global persistence
+    if persistence is not None:
+        persistence.close()
+        persistence = None
 
 
 # ---------------------------------------------------------
-# Funciones CRUD para manejar el arreglo
+# Funciones CRUD sobre el almacén
 # ---------------------------------------------------------
 
 def get_all_tasks() -> List[Task]:
-    return tasks
+    return store.all()
 
 
 def get_task_by_id(task_id: int) -> Optional[Task]:
-    return next((t for t in tasks if t.id == task_id), None)
+    return store.get(task_id)
 
 
-def create_task(data: TaskCreate) -> Task:
-    global current_id
-    current_id += 1
+def get_task_versioned(task_id: int) -> Tuple[Optional[Task], int]:
+    return store.get_versioned(task_id)
 
-    new_task = Task(
-        id=current_id,
-        title=data.title,
-        done=data.done,
-    )
-    tasks.append(new_task)
-    return new_task
 
+def get_version() -> int:
+    return store.version
 
-def update_task(task_id: int, data: TaskUpdate) -> Optional[Task]:
-    task = get_task_by_id(task_id)
-    if task is None:
-        return None
 
-    task.title = data.title
-    task.done = data.done
-    return task
+def store_stats() -> dict:
+    return {
+        "tasks": len(store),
+        "memory_bytes": store.memory_usage(),
+        "version": store.version,
+    }
 
 
-def patch_task(task_id: int, data: TaskPatch) -> Optional[Task]:
-    task = get_task_by_id(task_id)
-    if task is None:
-        return None
+def query_tasks(
+    after: int = 0,
+    limit: Optional[int] = None,
+    done: Optional[bool] = None,
+    prefix: Optional[str] = None,
+    search: Optional[str] = None,
+) -> Tuple[List[Task], Optional[int]]:
+    return store.query(after, limit, done=done, prefix=prefix, search=search)
+
+
+def create_task(data: TaskCreate) -> Task:
+    return store.add(data.title, data.done)
 
-    if data.title is not None:
-        task.title = data.title
-    if data.done is not None:
-        task.done = data.done
 
-    return task
+def update_task(task_id: int, data: TaskUpdate) -> Optional[Task]:
+    return store.update(task_id, title=data.title, done=data.done)
+
+
+def patch_task(task_id: int, data: TaskPatch) -> Optional[Task]:
+    with changes.tagging("patched"):
+        return store.update(task_id, title=data.title, done=data.done)
 
 
 def delete_task(task_id: int) -> bool:
-    global tasks
-    task = get_task_by_id(task_id)
-    if task is None:
-        return False
+    return store.remove(task_id)
+
+
+# ---------------------------------------------------------
+# Operaciones por lotes (se aplican al almacén de una vez)
+# ---------------------------------------------------------
+
+def create_tasks(items: List[TaskCreate]) -> List[Task]:
+    return store.add_many((d.title, d.done) for d in items)
+
+
+def patch_tasks(items: List[TaskBulkPatch]) -> List[Optional[Task]]:
+    with changes.tagging("patched"):
+        return store.update_many((d.id, d.title, d.done) for d in items)
+
 
-    tasks = [t for t in tasks if t.id != task_id]
-    return True
+def delete_tasks(task_ids: List[int]) -> List[bool]:
+    return store.remove_many(task_ids)
 
 if __name__ == "__main__":
     # Pruebas básicas del módulo arreglo.py
@@ -0,0 +1,376 @@
+# Persistencia opcional del almacén: WAL + snapshots
+
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models.tasks_store import BaseTaskStore
+
+
+# ---------------------------------------------------------
+# Formato en disco
+# ---------------------------------------------------------
+#
+# Directorio de datos:
+#
+#   LOCK                        cerrojo (flock) del proceso que lo usa
+#   tasks.snap                  snapshot compactado (binario)
+#   wal-<primer seq>.log        segmentos del WAL (append-only)
+#
+# WAL: una línea por cambio, `<crc32 hex> <json>\n`, con el número de
+# secuencia (`s`), la operación (`o`: c/u/d) y el estado resultante de la
+# tarea. Reaplicar un registro es idempotente. Una línea incompleta o con
+# CRC incorrecto marca el final válido del log (escritura cortada por una
+# caída).
+#
+# Snapshot: cabecera `<8sQQQ` (magia, último seq incluido, current_id,
+# número de tareas) y por cada tarea `<qBI` (id, done, longitud del título)
+# seguido del título en UTF-8. Se escribe a un fichero temporal y se
+# renombra, así que siempre hay un snapshot completo en disco.
+
+SNAPSHOT_MAGIC = b"TASKSNP1"
+_HEADER = struct.Struct("<8sQQQ")
+_RECORD = struct.Struct("<qBI")
+
+FSYNC_MODES = ("always", "batch", "off")
+
+
+def _encode(seq: int, op: str, task_id: int, task) -> bytes:
+    record = {"s": seq, "o": op[0], "i": task_id}
+    if task is not None:
+        record["t"] = task.title
+        record["d"] = task.done
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode()
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _decode(line: bytes) -> Optional[dict]:
+    if not line.endswith(b"\n") or len(line) < 10:
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def write_snapshot(path: str, tasks: List[object], current_id: int, last_seq: int) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, last_seq, current_id, len(tasks)))
+        buf = bytearray()
+        for task in tasks:
+            title = task.title.encode()
+            buf += _RECORD.pack(task.id, task.done, len(title))
+            buf += title
+            if len(buf) >= 1 << 20:
+                f.write(buf)
+                buf.clear()
+        f.write(buf)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(os.path.dirname(path))
+
+
+def read_snapshot(path: str) -> Tuple[int, int, List[Tuple[int, str, bool]]]:
+    """Devuelve `(last_seq, current_id, [(id, title, done), ...])`."""
+    if not os.path.exists(path) or os.path.getsize(path) < _HEADER.size:
+        return 0, 0, []
+
+    with open(path, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        magic, last_seq, current_id, count = _HEADER.unpack_from(m, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path}: no es un snapshot de tareas")
+
+        tasks = []
+        unpack = _RECORD.unpack_from
+        size = _RECORD.size
+        pos = _HEADER.size
+        for _ in range(count):
+            task_id, done, length = unpack(m, pos)
+            pos += size
+            tasks.append((task_id, m[pos:pos + length].decode(), bool(done)))
+            pos += length
+    return last_seq, current_id, tasks
+
+
+class DataDirLocked(RuntimeError):
+    """Otro proceso ya está usando el directorio de datos."""
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# ---------------------------------------------------------
+# Motor de persistencia
+# ---------------------------------------------------------
+#
+# Se suscribe al almacén y registra cada cambio en el WAL. El modo de
+# `fsync` decide cuánta durabilidad se cambia por latencia:
+#
+#   - "always": cada cambio se escribe y se sincroniza antes de responder.
+#   - "batch":  commit en grupo; los cambios se acumulan en memoria y un
+#               hilo los escribe y sincroniza cada `fsync_interval`
+#               segundos. Una caída puede perder como mucho ese intervalo.
+#   - "off":    se escribe en el fichero pero la sincronización queda en
+#               manos del sistema operativo.
+#
+# Cada `snapshot_every` cambios se escribe un snapshot compactado en
+# segundo plano y se borran los segmentos del WAL que ya cubre.
+#
+# Un directorio de datos solo puede tenerlo abierto un proceso: dos motores
+# escribiendo el mismo WAL lo corromperían (p. ej. `uvicorn --workers N`).
+# `open` toma un `flock` exclusivo sobre `LOCK` y falla de inmediato si ya
+# lo tiene otro; el sistema lo libera aunque el proceso muera.
+
+class PersistenceEngine:
+    def __init__(
+        self,
+        store: BaseTaskStore,
+        data_dir: str,
+        fsync: str = "batch",
+        fsync_interval: float = 0.01,
+        snapshot_every: int = 100_000,
+    ):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"fsync debe ser uno de {FSYNC_MODES}")
+
+        self.store = store
+        self.data_dir = data_dir
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+
+        self._seq = 0
+        self._wal = None
+        self._lock_fd: Optional[int] = None
+        self._buffer: List[bytes] = []
+        # `_lock` protege el búfer y `seq` (secciones muy cortas);
+        # `_io_lock` serializa las escrituras y el cambio de segmento, de
+        # modo que un fsync lento no bloquea a quien está registrando cambios.
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._torn: Optional[Tuple[str, int]] = None
+        self._since_snapshot = 0
+        self._snapshot_wanted = threading.Event()
+        self._closing = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.data_dir, "tasks.snap")
+
+    # -----------------------------------------------------
+    # Arranque y parada
+    # -----------------------------------------------------
+
+    def open(self) -> Dict[str, float]:
+        """Recupera el estado desde disco y empieza a registrar cambios.
+
+        Devuelve estadísticas de la recuperación (tareas, registros del WAL
+        reaplicados y segundos empleados). Lanza `DataDirLocked` si otro
+        proceso ya tiene abierto el directorio de datos.
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._acquire_lock()
+        try:
+            return self._recover()
+        except BaseException:
+            self.store.unsubscribe(self._on_change)
+            self._release_lock()
+            raise
+
+    def _recover(self) -> Dict[str, float]:
+        start = time.perf_counter()
+
+        last_seq, current_id, rows = read_snapshot(self.snapshot_path)
+        tasks = {task_id: (title, done) for task_id, title, done in rows}
+        replayed = 0
+        for record in self._replay(last_seq):
+            task_id = record["i"]
+            if record["o"] == "d":
+                tasks.pop(task_id, None)
+            else:
+                tasks[task_id] = (record["t"], record["d"])
+                current_id = max(current_id, task_id)
+            last_seq = record["s"]
+            replayed += 1
+
+        self.store.load(
+            ((task_id, title, done) for task_id, (title, done) in tasks.items()),
+            current_id,
+        )
+        self._discard_torn_tail()
+        self._seq = last_seq
+        self._since_snapshot = replayed
+        self._wal = self._open_segment(last_seq + 1)
+        self.store.subscribe(self._on_change)
+
+        for target in (self._flush_loop, self._snapshot_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        return {
+            "tasks": len(tasks),
+            "replayed": replayed,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def close(self) -> None:
+        """Vacía el WAL, escribe un snapshot final y detiene los hilos.
+
+        Deja de recibir cambios del almacén, que puede volver a abrirse con
+        otro motor en el mismo proceso (p. ej. un segundo ciclo de vida de
+        la app)."""
+        self.store.unsubscribe(self._on_change)
+        self._closing.set()
+        self._snapshot_wanted.set()
+        for thread in self._threads:
+            thread.join()
+        self.flush()
+        self.snapshot()
+        with self._io_lock:
+            self._wal.close()
+        self._release_lock()
+
+    def _acquire_lock(self) -> None:
+        path = os.path.join(self.data_dir, "LOCK")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise DataDirLocked(
+                f"{self.data_dir}: el directorio de datos ya está en uso por otro proceso"
+            ) from None
+        # El pid solo sirve para diagnosticar quién lo tiene
+        os.ftruncate(fd, 0)
+        os.write(fd, b"%d\n" % os.getpid())
+        self._lock_fd = fd
+
+    def _release_lock(self) -> None:
+        if self._lock_fd is not None:
+            # Cerrar el descriptor libera el flock
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    # -----------------------------------------------------
+    # WAL
+    # -----------------------------------------------------
+
+    def _on_change(self, op: str, task_id: int, task) -> None:
+        # Se ejecuta con el cerrojo de escritura del almacén tomado, así que
+        # el orden de `seq` es el orden en que se aplicaron los cambios.
+        with self._lock:
+            self._seq += 1
+            self._buffer.append(_encode(self._seq, op, task_id, task))
+        if self.fsync == "always":
+            self.flush()
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self._snapshot_wanted.set()
+
+    def flush(self) -> None:
+        with self._io_lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        # Requiere `_io_lock`
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+        self._wal.write(b"".join(batch))
+        self._wal.flush()
+        if self.fsync != "off":
+            os.fsync(self._wal.fileno())
+
+    def _flush_loop(self) -> None:
+        while not self._closing.wait(self.fsync_interval):
+            self.flush()
+
+    def _open_segment(self, first_seq: int):
+        path = os.path.join(self.data_dir, f"wal-{first_seq:020d}.log")
+        wal = open(path, "ab")
+        _fsync_dir(self.data_dir)
+        return wal
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        segments = []
+        for name in os.listdir(self.data_dir):
+            if name.startswith("wal-") and name.endswith(".log"):
+                segments.append((int(name[4:-4]), os.path.join(self.data_dir, name)))
+        return sorted(segments)
+
+    def _replay(self, after_seq: int) -> Iterator[dict]:
+        for _, path in self._segments():
+            with open(path, "rb") as f:
+                offset = 0
+                for line in f:
+                    record = _decode(line)
+                    if record is None:
+                        # Final válido del log: lo que sigue no se confirmó
+                        self._torn = (path, offset)
+                        return
+                    offset += len(line)
+                    if record["s"] > after_seq:
+                        yield record
+
+    def _discard_torn_tail(self) -> None:
+        """Trunca el registro cortado y borra lo posterior, para que los
+        nuevos cambios no queden detrás de datos inválidos."""
+        if self._torn is None:
+            return
+        torn_path, offset = self._torn
+        os.truncate(torn_path, offset)
+        for _, path in self._segments():
+            if path > torn_path:
+                os.remove(path)
+        self._torn = None
+
+    # -----------------------------------------------------
+    # Snapshots
+    # -----------------------------------------------------
+
+    def snapshot(self) -> None:
+        """Escribe un snapshot compactado y borra el WAL que ya cubre."""
+
+        def capture(tasks, current_id):
+            # Escrituras detenidas: se cierra el segmento actual y las
+            # siguientes irán a uno nuevo que empieza en `seq + 1`.
+            with self._io_lock:
+                self._flush_locked()
+                self._wal.close()
+                self._wal = self._open_segment(self._seq + 1)
+                self._since_snapshot = 0
+                return tasks, current_id, self._seq
+
+        tasks, current_id, last_seq = self.store.checkpoint(capture)
+        write_snapshot(self.snapshot_path, tasks, current_id, last_seq)
+        for first_seq, path in self._segments():
+            if first_seq <= last_seq:
+                os.remove(path)
+
+    def _snapshot_loop(self) -> None:
+        while True:
+            self._snapshot_wanted.wait()
+            if self._closing.is_set():
+                return
+            self._snapshot_wanted.clear()
+            self.snapshot()
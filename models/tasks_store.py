@@ -0,0 +1,685 @@
+# Almacén en memoria para tareas indexado por id
+
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from itertools import islice
+from math import isqrt
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# ---------------------------------------------------------
+# Índice auxiliar: lista ordenada por bloques
+# ---------------------------------------------------------
+#
+# Lista ordenada partida en bloques de tamaño acotado (como una B-tree de un
+# solo nivel). Insertar o borrar mueve solo los elementos de un bloque, así
+# que el coste no crece con el tamaño total, y recorrer desde un valor
+# empieza con dos búsquedas binarias.
+
+class _SortedList:
+    _LOAD = 512
+
+    def __init__(self):
+        self._lists: List[list] = []
+        self._maxes: list = []
+        self._len: int = 0
+        # `id` de los bloques compartidos con el original (ver `copy`)
+        self._shared: Set[int] = set()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, value) -> None:
+        lists, maxes = self._lists, self._maxes
+        if not maxes:
+            lists.append([value])
+            maxes.append(value)
+        else:
+            i = bisect_left(maxes, value)
+            if i == len(maxes):
+                i -= 1
+                self._own(i).append(value)
+                maxes[i] = value
+            else:
+                insort(self._own(i), value)
+            if len(lists[i]) > 2 * self._LOAD:
+                half = lists[i][self._LOAD:]
+                del lists[i][self._LOAD:]
+                maxes[i] = lists[i][-1]
+                lists.insert(i + 1, half)
+                maxes.insert(i + 1, half[-1])
+        self._len += 1
+
+    def discard(self, value) -> None:
+        lists, maxes = self._lists, self._maxes
+        i = bisect_left(maxes, value)
+        if i == len(maxes):
+            return
+        block = lists[i]
+        j = bisect_left(block, value)
+        if j == len(block) or block[j] != value:
+            return
+        block = self._own(i)
+        del block[j]
+        self._len -= 1
+        if not block:
+            del lists[i]
+            del maxes[i]
+        elif j == len(block):
+            maxes[i] = block[-1]
+
+    def iter_after(self, after) -> Iterator:
+        """Recorre en orden los valores estrictamente mayores que `after`."""
+        while True:
+            i = bisect_right(self._maxes, after)
+            if i >= len(self._lists):
+                return
+            block = self._lists[i]
+            chunk = block[bisect_right(block, after):]
+            if not chunk:
+                return
+            yield from chunk
+            after = chunk[-1]
+
+    def load(self, values: Iterable) -> None:
+        """Sustituye el contenido; más rápido que `add` uno a uno."""
+        values = sorted(values)
+        load = self._LOAD
+        self._lists = [values[i:i + load] for i in range(0, len(values), load)]
+        self._maxes = [block[-1] for block in self._lists]
+        self._len = len(values)
+        self._shared = set()
+
+    def copy(self) -> "_SortedList":
+        """Copia que comparte los bloques hasta que los modifica."""
+        other = _SortedList()
+        other._lists = self._lists[:]
+        other._maxes = self._maxes[:]
+        other._len = self._len
+        other._shared = {id(block) for block in self._lists}
+        return other
+
+    def detach(self) -> None:
+        """Deja de compartir bloques con el original de `copy` (cuando la
+        copia lo sustituye)."""
+        self._shared = set()
+
+    def clear(self) -> None:
+        self._lists = []
+        self._maxes = []
+        self._len = 0
+        self._shared = set()
+
+    def _own(self, i: int) -> list:
+        block = self._lists[i]
+        if id(block) in self._shared:
+            self._shared.discard(id(block))
+            block = self._lists[i] = block[:]
+        return block
+
+
+# ---------------------------------------------------------
+# Índice de títulos: orden alfabético + trigramas
+# ---------------------------------------------------------
+#
+# - Prefijo: lista ordenada de `(titulo, id)`; las coincidencias empiezan en
+#   `(prefijo,)` y se recorren hasta el primer título que no lo comparte.
+#   Si hay demasiadas se abandona el recorrido (ver `_title_candidates`).
+# - Subcadena: índice invertido `trigrama -> ids`; se intersectan los
+#   conjuntos de los trigramas de la búsqueda (empezando por el menor) y se
+#   verifican los candidatos. Si el menor ya tiene demasiados ids se
+#   abandona la intersección (ver `_title_candidates`).
+#
+# Ambos comparan en minúsculas (`casefold`).
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _TitleIndex:
+    def __init__(self):
+        self._sorted = _SortedList()
+        self._grams: Dict[str, Set[int]] = {}
+
+    def add(self, task_id: int, title: str) -> None:
+        key = title.casefold()
+        self._sorted.add((key, task_id))
+        for gram in _trigrams(key):
+            self._grams.setdefault(gram, set()).add(task_id)
+
+    def discard(self, task_id: int, title: str) -> None:
+        key = title.casefold()
+        self._sorted.discard((key, task_id))
+        for gram in _trigrams(key):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(task_id)
+                if not ids:
+                    del self._grams[gram]
+
+    def with_prefix(self, prefix: str, cap: int) -> Optional[List[int]]:
+        """Ids cuyo título empieza por `prefix`, o `None` si hay más de
+        `cap` (entonces sale más barato recorrer los ids)."""
+        key = prefix.casefold()
+        ids = []
+        for title, task_id in self._sorted.iter_after((key,)):
+            if not title.startswith(key):
+                break
+            if len(ids) == cap:
+                return None
+            ids.append(task_id)
+        return ids
+
+    def containing(self, text: str, cap: int) -> Optional[Set[int]]:
+        """Candidatos que contienen `text`, o `None` si es demasiado corto
+        para usar el índice (menos de 3 caracteres) o el trigrama menos
+        frecuente tiene más de `cap` ids."""
+        grams = _trigrams(text.casefold())
+        if not grams:
+            return None
+        sets = sorted((self._grams.get(g, set()) for g in grams), key=len)
+        if len(sets[0]) > cap:
+            return None
+        return set(sets[0]).intersection(*sets[1:])
+
+    def load(self, titles: Iterable[Tuple[int, str]]) -> None:
+        """Sustituye el contenido; más rápido que `add` uno a uno."""
+        keys = []
+        grams: Dict[str, Set[int]] = {}
+        for task_id, title in titles:
+            key = title.casefold()
+            keys.append((key, task_id))
+            for gram in _trigrams(key):
+                ids = grams.get(gram)
+                if ids is None:
+                    grams[gram] = {task_id}
+                else:
+                    ids.add(task_id)
+        self._sorted.load(keys)
+        self._grams = grams
+
+    def stage(self, titles: Iterable[Tuple[int, str]]) -> tuple:
+        """Prepara el alta de `(id, título)` sin tocar el índice; `apply`
+        la publica."""
+        keys = self._sorted.copy()
+        added: Dict[str, List[int]] = {}
+        for task_id, title in titles:
+            key = title.casefold()
+            keys.add((key, task_id))
+            for gram in _trigrams(key):
+                ids = added.get(gram)
+                if ids is None:
+                    added[gram] = [task_id]
+                else:
+                    ids.append(task_id)
+        # Los conjuntos que al menos se duplican se construyen ya y al
+        # publicar solo se sustituyen; el resto se amplía entonces (copiarlos
+        # costaría más que lo que se añade)
+        replaced: Dict[str, Set[int]] = {}
+        for gram in list(added):
+            current = self._grams.get(gram)
+            if current is None or len(added[gram]) >= len(current):
+                replaced[gram] = set(added.pop(gram)).union(current or ())
+        return keys, replaced, added
+
+    def apply(self, staged: tuple) -> None:
+        keys, replaced, added = staged
+        keys.detach()
+        self._sorted = keys
+        self._grams.update(replaced)
+        for gram, ids in added.items():
+            self._grams[gram].update(ids)
+
+    def clear(self) -> None:
+        self._sorted.clear()
+        self._grams = {}
+
+
+# ---------------------------------------------------------
+# Base común de los almacenes
+# ---------------------------------------------------------
+#
+# Concurrencia (las rutas síncronas de FastAPI se ejecutan en un pool de
+# hilos):
+#
+#   - Las escrituras se serializan con un cerrojo y nunca modifican una
+#     tarea ya entregada: la sustituyen por una nueva. Los ids se asignan
+#     dentro de ese cerrojo, así que las tareas se insertan (y se notifican)
+#     siempre en orden creciente de id.
+#   - Las lecturas no toman ningún cerrojo: leen de forma optimista con un
+#     contador de secuencia (seqlock) y repiten si hubo una escritura en
+#     medio, así que un lote se ve completo o no se ve. Nunca toman el
+#     cerrojo de escritura: si coinciden con una escritura esperan con
+#     pausas crecientes, sin pasar de `_READ_BACKOFF_MAX` segundos cada vez,
+#     y el escritor cede el GIL al terminar si hay alguno esperando.
+#   - Las creaciones de `_STAGE_BATCH` tareas o más se preparan aparte
+#     (ids, versiones, altas en los índices) mientras los lectores siguen
+#     leyendo el contenido anterior, y solo se publican con el seqlock
+#     impar (`_publishing`), con operaciones en bloque. Así importar muchas
+#     tareas no detiene a los lectores mientras dura; las demás escrituras
+#     los detienen mientras se aplican (los lotes de la API están acotados
+#     por TASKS_BULK_MAX).
+#
+# Cada cambio incrementa un contador global (`version`) y guarda ese valor
+# como versión de la tarea afectada; sirven para ETags y cachés.
+#
+# Los suscriptores (`subscribe`) reciben cada cambio aplicado, en orden y
+# con el cerrojo de escritura tomado; así se implementa la persistencia. En
+# una creación grande los reciben antes de publicarla, así que quedan en el
+# WAL antes de que los vean los lectores, igual que el resto.
+#
+# Los almacenes no conocen los modelos Pydantic: reciben una `factory` que
+# construye la tarea a partir de `id`, `title` y `done`. Las subclases solo
+# implementan la disposición de los datos (métodos `_all`, `_get_versioned`,
+# `_query`, `_insert`, `_update`, `_remove`, `clear` y `load`).
+
+_READ_RETRIES = 3
+_READ_BACKOFF_MAX = 0.001
+_STAGE_BATCH = 1024
+
+
+class BaseTaskStore:
+    def __init__(self, factory: Callable[..., object]):
+        self._factory = factory
+        self._current_id: int = 0
+        self._id_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # Par: sin escrituras en curso; impar: escritura en curso
+        self._seq: int = 0
+        # Algún lector lleva varios intentos esperando (ver `_publishing`)
+        self._readers_waiting = False
+        self._listeners: List[Callable[[str, int, Optional[object]], None]] = []
+        self._version: int = 0
+
+    @property
+    def current_id(self) -> int:
+        return self._current_id
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def all(self) -> List[object]:
+        return self._read(self._all)
+
+    def get(self, task_id: int) -> Optional[object]:
+        return self.get_versioned(task_id)[0]
+
+    def get_versioned(self, task_id: int) -> Tuple[Optional[object], int]:
+        """Devuelve `(tarea, versión de la tarea)`; `(None, 0)` si no existe."""
+        return self._read(lambda: self._get_versioned(task_id))
+
+    def query(
+        self,
+        after: int = 0,
+        limit: Optional[int] = None,
+        done: Optional[bool] = None,
+        prefix: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> Tuple[List[object], Optional[int]]:
+        """Página de tareas con id mayor que `after` que cumplen los filtros.
+
+        Devuelve `(tareas, cursor)`, donde `cursor` es el id a usar como
+        `after` en la siguiente página o `None` si no hay más resultados.
+        """
+        return self._read(lambda: self._query(after, limit, done, prefix, search))
+
+    def add(self, title: str, done: bool = False) -> object:
+        return self.add_many([(title, done)])[0]
+
+    def add_many(self, items: Iterable[Tuple[str, bool]]) -> List[object]:
+        """Crea varias tareas con ids consecutivos."""
+        items = self._prepare(list(items))
+        # `_insert` marca con `_publishing` lo que deben ver los lectores
+        with self._id_lock, self._write_lock:
+            return self._insert(items)
+
+    def update(
+        self,
+        task_id: int,
+        title: Optional[str] = None,
+        done: Optional[bool] = None,
+    ) -> Optional[object]:
+        """Modifica los campos recibidos; `None` deja el valor actual."""
+        return self.update_many([(task_id, title, done)])[0]
+
+    def update_many(
+        self,
+        changes: Iterable[Tuple[int, Optional[str], Optional[bool]]],
+    ) -> List[Optional[object]]:
+        """Aplica `(id, title, done)` en orden; `None` si el id no existe."""
+        with self._writing():
+            return [self._update(*change) for change in changes]
+
+    def remove(self, task_id: int) -> bool:
+        return self.remove_many([task_id])[0]
+
+    def remove_many(self, task_ids: Iterable[int]) -> List[bool]:
+        with self._writing():
+            return [self._remove(task_id) for task_id in task_ids]
+
+    def subscribe(self, listener: Callable[[str, int, Optional[object]], None]) -> None:
+        """Registra `listener(op, task_id, task)`; `op` es "create",
+        "update" o "delete" (en este caso `task` es `None`)."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[str, int, Optional[object]], None]) -> None:
+        """Retira un `listener` registrado con `subscribe` (si lo está)."""
+        with self._write_lock:
+            # Lista nueva: `_notify` puede estar recorriendo la anterior
+            self._listeners = [l for l in self._listeners if l != listener]
+
+    def checkpoint(self, fn: Callable[[List[object], int], object]) -> object:
+        """Ejecuta `fn(tareas, current_id)` con las escrituras detenidas."""
+        with self._id_lock, self._write_lock:
+            return fn(self._all(), self._current_id)
+
+    # -----------------------------------------------------
+    # Sincronización
+    # -----------------------------------------------------
+
+    @contextmanager
+    def _writing(self):
+        with self._write_lock, self._publishing():
+            yield
+
+    @contextmanager
+    def _publishing(self):
+        # Requiere el cerrojo de escritura
+        self._seq += 1
+        try:
+            yield
+        finally:
+            self._seq += 1
+        if self._readers_waiting:
+            # Cede el GIL con el seqlock par: si no, un lector que espera
+            # apenas encuentra huecos entre escrituras seguidas
+            self._readers_waiting = False
+            time.sleep(0)
+
+    def _prepare(self, items: List[Tuple[str, bool]]) -> list:
+        """Prepara fuera del cerrojo los `(title, done)` de `add_many`."""
+        return items
+
+    def _read(self, fn):
+        """Ejecuta `fn` sin cerrojo y repite si coincidió con una escritura.
+        Los primeros `_READ_RETRIES` reintentos solo ceden el GIL; después
+        duerme con pausas que se duplican hasta `_READ_BACKOFF_MAX`."""
+        delay = 0.0
+        attempt = 0
+        while True:
+            seq = self._seq
+            if not seq & 1:
+                try:
+                    result = fn()
+                except Exception:
+                    # Un error solo se ignora si hubo una escritura en medio
+                    # (estructura modificada mientras se recorría)
+                    if self._seq == seq:
+                        raise
+                else:
+                    if self._seq == seq:
+                        return result
+            attempt += 1
+            if attempt > _READ_RETRIES:
+                self._readers_waiting = True
+                delay = min(delay * 2 or 1e-5, _READ_BACKOFF_MAX)
+            time.sleep(delay)
+
+    # -----------------------------------------------------
+    # Versiones y suscriptores (requieren el cerrojo de escritura)
+    # -----------------------------------------------------
+
+    def _bump(self) -> int:
+        self._version += 1
+        return self._version
+
+    def _notify(self, op: str, task_id: int, task) -> None:
+        for listener in self._listeners:
+            listener(op, task_id, task)
+
+    @staticmethod
+    def _matches(task, done, prefix, search) -> bool:
+        if done is not None and task.done != done:
+            return False
+        title = task.title.casefold()
+        if prefix and not title.startswith(prefix.casefold()):
+            return False
+        if search and search.casefold() not in title:
+            return False
+        return True
+
+
+# ---------------------------------------------------------
+# Almacén indexado (por defecto)
+# ---------------------------------------------------------
+#
+# Las tareas se guardan en un diccionario `id -> tarea`. Los diccionarios
+# de Python son tablas hash que conservan el orden de inserción, así que
+# buscar, actualizar y eliminar por id es O(1) y listar devuelve las tareas
+# en el orden en que se guardaron.
+#
+# Además mantiene índices secundarios (ids por estado `done` y títulos)
+# que se actualizan en cada escritura, para paginar y filtrar sin recorrer
+# todas las tareas.
+#
+# Las tareas nuevas se construyen fuera del cerrojo de escritura, y las que
+# no han cambiado desde la última carga comparten la versión de esa carga.
+
+class TaskStore(BaseTaskStore):
+    def __init__(self, factory: Callable[..., object]):
+        super().__init__(factory)
+        self._tasks: Dict[int, object] = {}
+        self._ids = _SortedList()
+        self._by_done = {True: _SortedList(), False: _SortedList()}
+        self._titles = _TitleIndex()
+        self._base_version: int = 0
+        self._versions: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self._tasks
+
+    def get(self, task_id: int) -> Optional[object]:
+        # Consulta atómica al diccionario: no necesita el seqlock
+        return self._tasks.get(task_id)
+
+    def memory_usage(self, sample: int = 100) -> int:
+        """Estimación en bytes: el diccionario más el tamaño medio de las
+        primeras `sample` tareas (objeto, atributos y título) por tarea."""
+        tasks = list(islice(self._tasks.values(), sample))
+        if not tasks:
+            return sys.getsizeof(self._tasks)
+        per_task = sum(
+            sys.getsizeof(t) + sys.getsizeof(getattr(t, "__dict__", {}))
+            + sys.getsizeof(t.title)
+            for t in tasks
+        ) / len(tasks)
+        return sys.getsizeof(self._tasks) + int(per_task * len(self._tasks))
+
+    def clear(self) -> None:
+        with self._id_lock, self._writing():
+            self._tasks.clear()
+            self._current_id = 0
+            self._ids.clear()
+            for ids in self._by_done.values():
+                ids.clear()
+            self._titles.clear()
+            self._reset_versions()
+
+    def load(self, tasks: Iterable[Tuple[int, str, bool]], current_id: int = 0) -> None:
+        """Sustituye el contenido por `(id, title, done)` sin notificar a
+        los suscriptores (por ejemplo, al recuperar desde disco)."""
+        with self._id_lock, self._writing():
+            factory = self._factory
+            self._tasks = {
+                task_id: factory(id=task_id, title=title, done=done)
+                for task_id, title, done in sorted(tasks)
+            }
+            self._current_id = max(current_id, max(self._tasks, default=0))
+            values = self._tasks.values()
+            self._ids.load(self._tasks)
+            self._by_done[True].load(t.id for t in values if t.done)
+            self._by_done[False].load(t.id for t in values if not t.done)
+            self._titles.load((t.id, t.title) for t in values)
+            self._reset_versions()
+
+    # -----------------------------------------------------
+    # Operaciones internas
+    # -----------------------------------------------------
+
+    def _all(self):
+        return list(self._tasks.values())
+
+    def _query(self, after, limit, done, prefix, search):
+        ids = None
+        if prefix or search:
+            ids = self._title_candidates(after, limit, prefix, search)
+        if ids is None:
+            base = self._ids if done is None else self._by_done[done]
+            ids = base.iter_after(after)
+
+        page = []
+        for task_id in ids:
+            task = self._tasks.get(task_id)
+            if task is None or not self._matches(task, done, prefix, search):
+                continue
+            if limit is not None and len(page) == limit:
+                return page, page[-1].id
+            page.append(task)
+        return page, None
+
+    def _get_versioned(self, task_id):
+        task = self._tasks.get(task_id)
+        if task is None:
+            return None, 0
+        return task, self._versions.get(task_id, self._base_version)
+
+    def _prepare(self, items):
+        # Se construyen fuera del cerrojo con un id provisional; el id
+        # definitivo se asigna al insertarlas, antes de entregarlas
+        return [self._factory(id=0, title=title, done=done) for title, done in items]
+
+    def _insert(self, created):
+        if len(created) < _STAGE_BATCH:
+            with self._publishing():
+                for task in created:
+                    self._current_id += 1
+                    task.id = self._current_id
+                    self._tasks[task.id] = task
+                    self._index(task)
+                    self._versions[task.id] = self._bump()
+                    self._notify("create", task.id, task)
+            return created
+
+        # Lote grande: ids, versiones y altas en los índices se preparan sin
+        # tocar lo publicado. Los índices de ids se copian por bloques (solo
+        # se duplican los que cambian) y se sustituyen al publicar.
+        first_id = self._current_id + 1
+        first_version = self._version + 1
+        for offset, task in enumerate(created):
+            task.id = first_id + offset
+        tasks = {task.id: task for task in created}
+        versions = dict(zip(tasks, range(first_version, first_version + len(created))))
+        ids = self._ids.copy()
+        by_done = {done: index.copy() for done, index in self._by_done.items()}
+        for task in created:
+            ids.add(task.id)
+            by_done[task.done].add(task.id)
+        titles = self._titles.stage((task.id, task.title) for task in created)
+        for task in created:
+            self._notify("create", task.id, task)
+
+        with self._publishing():
+            self._tasks.update(tasks)
+            self._versions.update(versions)
+            for index in (ids, *by_done.values()):
+                index.detach()
+            self._ids = ids
+            self._by_done = by_done
+            self._titles.apply(titles)
+            self._current_id = first_id + len(created) - 1
+            self._version = first_version + len(created) - 1
+        return created
+
+    def _update(self, task_id, title, done):
+        task = self._tasks.get(task_id)
+        if task is None:
+            return None
+
+        new_task = self._factory(
+            id=task_id,
+            title=task.title if title is None else title,
+            done=task.done if done is None else done,
+        )
+        if new_task.title != task.title:
+            self._titles.discard(task_id, task.title)
+            self._titles.add(task_id, new_task.title)
+        if new_task.done != task.done:
+            self._by_done[task.done].discard(task_id)
+            self._by_done[new_task.done].add(task_id)
+        self._tasks[task_id] = new_task
+        self._versions[task_id] = self._bump()
+        self._notify("update", task_id, new_task)
+        return new_task
+
+    def _remove(self, task_id):
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return False
+
+        self._unindex(task)
+        self._versions.pop(task_id, None)
+        self._bump()
+        self._notify("delete", task_id, None)
+        return True
+
+    def _reset_versions(self) -> None:
+        self._base_version = self._bump()
+        self._versions = {}
+
+    # -----------------------------------------------------
+    # Mantenimiento de índices
+    # -----------------------------------------------------
+
+    def _index(self, task) -> None:
+        self._ids.add(task.id)
+        self._by_done[task.done].add(task.id)
+        self._titles.add(task.id, task.title)
+
+    def _unindex(self, task) -> None:
+        self._ids.discard(task.id)
+        self._by_done[task.done].discard(task.id)
+        self._titles.discard(task.id, task.title)
+
+    def _title_candidates(
+        self,
+        after: int,
+        limit: Optional[int],
+        prefix: Optional[str],
+        search: Optional[str],
+    ) -> Optional[Iterator[int]]:
+        # Plan según la selectividad. Con `m` coincidencias entre `n` tareas,
+        # recorrer los ids desde el cursor examina unas `limit * n / m`
+        # tareas hasta llenar la página, y usar el índice cuesta ordenar
+        # las `m` coincidencias. El índice solo compensa mientras
+        # m² < limit * n; por encima se devuelve `None` y se recorren los ids.
+        n = len(self._tasks)
+        cap = n if limit is None else max(limit, isqrt(limit * n))
+        candidates = None
+        if prefix:
+            candidates = self._titles.with_prefix(prefix, cap)
+        if search:
+            found = self._titles.containing(search, cap)
+            if found is not None and (candidates is None or len(found) < len(candidates)):
+                candidates = found
+        if candidates is None:
+            return None
+        # Los candidatos se verifican después contra el título actual, así
+        # que basta con el conjunto más pequeño
+        return iter(sorted({i for i in candidates if i > after}))
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from services import metrics
+from services.tasks_service import service_changes_feed, service_store_stats
+
+router = APIRouter(tags=["Metrics"])
+
+
+# Formato de texto de Prometheus. Es asíncrona para leer el estado del pool
+# de hilos desde el bucle de eventos; las estadísticas del almacén (que en
+# SQLite hacen consultas) se piden en el pool.
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    metrics.collect_threadpool()
+    metrics.collect_changes(service_changes_feed())
+    metrics.collect_store(await run_in_threadpool(service_store_stats))
+    return PlainTextResponse(
+        metrics.registry.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -1,21 +1,132 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+import os
+
+from fastapi import APIRouter, Body, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from typing import List, Optional
 from services.tasks_service import (
-    service_list_tasks,
-    service_get_task,
+    service_list_tasks_cached,
+    service_get_task_cached,
+    service_export_tasks,
     service_create_task,
     service_update_task,
     service_patch_task,
-    service_delete_task
+    service_delete_task,
+    service_create_tasks,
+    service_patch_tasks,
+    service_delete_tasks,
+    service_changes_feed,
+    service_wait_changes,
+    service_stream_changes,
+)
+from models.tasks_model import (
+    Task,
+    TaskCreate,
+    TaskUpdate,
+    TaskPatch,
+    TaskBulkPatch,
+    BulkResult,
+    Error,
+    TaskChanges,
+)
+from services import metrics
+from services.tasks_cache import etag_matches
+
+# Elementos máximos por petición en las operaciones por lotes (422 si se
+# supera): acota la memoria de validar el cuerpo y el tiempo que el lote
+# ocupa el cerrojo de escritura.
+BULK_MAX = int(os.environ.get("TASKS_BULK_MAX", "1000"))
+
+router = APIRouter(
+    prefix="/tasks",
+    tags=["Tasks"],
+    # Mide la espera en el pool de hilos de cada ruta síncrona
+    route_class=metrics.InstrumentedRoute if metrics.enabled else APIRoute,
 )
-from models.tasks_model import Task, TaskCreate, TaskUpdate, TaskPatch, Error
 
-router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+def _cached_response(cached, if_none_match: Optional[str]) -> Response:
+    headers = {"ETag": cached.etag}
+    if cached.next_cursor is not None:
+        headers["X-Next-Cursor"] = str(cached.next_cursor)
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
 
-@router.get("/", response_model=List[Task])
-def list_tasks():
-    return service_list_tasks()
+
+@router.get(
+    "/",
+    response_model=List[Task],
+    responses={304: {"description": "Sin cambios desde el ETag enviado"}}
+)
+def list_tasks(
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[int] = Query(None, ge=0),
+    done: Optional[bool] = None,
+    prefix: Optional[str] = Query(None, min_length=1),
+    search: Optional[str] = Query(None, min_length=1),
+    if_none_match: Optional[str] = Header(None),
+):
+    # Sin parámetros se devuelven todas las tareas (comportamiento original)
+    cached = service_list_tasks_cached(
+        cursor, limit, done=done, prefix=prefix, search=search,
+        if_none_match=if_none_match,
+    )
+    return _cached_response(cached, if_none_match)
+
+
+# Debe declararse antes de "/{id}" para que "export" no se tome como id.
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+def export_tasks(
+    after: int = Query(0, ge=0),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+):
+    return StreamingResponse(
+        service_export_tasks(after, chunk_size),
+        media_type="application/x-ndjson",
+    )
+
+
+# Feed de cambios: también antes de "/{id}".
+@router.get(
+    "/changes",
+    response_model=TaskChanges,
+    responses={501: {"model": Error}},
+)
+async def get_changes(
+    since: Optional[str] = Query(None, max_length=64),
+    timeout: float = Query(30, ge=0, le=60),
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    # Asíncrona: un cliente esperando no ocupa un hilo del pool
+    body = await service_wait_changes(since, timeout, limit)
+    if body is None:
+        raise HTTPException(status_code=501, detail="Not implemented for this backend")
+    return Response(content=body, media_type="application/json")
+
+
+@router.get(
+    "/changes/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}, 501: {"model": Error}},
+)
+async def stream_changes(
+    since: Optional[str] = Query(None, max_length=64),
+    last_event_id: Optional[str] = Header(None, max_length=64),
+):
+    if service_changes_feed() is None:
+        raise HTTPException(status_code=501, detail="Not implemented for this backend")
+    if last_event_id is not None:
+        since = last_event_id
+    return StreamingResponse(
+        service_stream_changes(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post(
@@ -27,16 +138,47 @@ def create_task(data: TaskCreate):
     return service_create_task(data)
 
 
+# Operaciones por lotes: también antes de "/{id}".
+@router.post(
+    "/bulk",
+    response_model=List[Task],
+    status_code=status.HTTP_201_CREATED
+)
+def create_tasks_bulk(items: List[TaskCreate] = Body(..., max_length=BULK_MAX)):
+    return service_create_tasks(items)
+
+
+@router.patch(
+    "/bulk",
+    response_model=List[BulkResult],
+    response_model_exclude_none=True
+)
+def patch_tasks_bulk(items: List[TaskBulkPatch] = Body(..., max_length=BULK_MAX)):
+    return service_patch_tasks(items)
+
+
+@router.delete(
+    "/bulk",
+    response_model=List[BulkResult],
+    response_model_exclude_none=True
+)
+def delete_tasks_bulk(ids: List[int] = Body(..., max_length=BULK_MAX)):
+    return service_delete_tasks(ids)
+
+
 @router.get(
     "/{id}",
     response_model=Task,
-    responses={404: {"model": Error}}
+    responses={
+        304: {"description": "Sin cambios desde el ETag enviado"},
+        404: {"model": Error},
+    }
 )
-def get_task_by_id(id: int):
-    task = service_get_task(id)
-    if task is None:
+def get_task_by_id(id: int, if_none_match: Optional[str] = Header(None)):
+    cached = service_get_task_cached(id)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Not found")
-    return task
+    return _cached_response(cached, if_none_match)
 
 
 @router.put(
@@ -0,0 +1,451 @@
+# services/metrics.py
+#
+# Métricas de la API en formato de texto de Prometheus.
+
+import inspect
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+
+# TASKS_METRICS=0 desactiva la instrumentación (middleware, tiempos del
+# backend y /metrics), por ejemplo para medir cuánto cuesta.
+enabled = os.environ.get("TASKS_METRICS", "1") != "0"
+
+
+# ---------------------------------------------------------
+# Tipos de métricas
+# ---------------------------------------------------------
+#
+# Contadores e histogramas se actualizan desde el bucle de eventos y desde
+# los hilos del pool. Para no tomar un cerrojo en cada petición, cada hilo
+# escribe en su propia copia (`threading.local`) y al exportar se suman
+# todas. Cuando un hilo termina (el pool los crea y los retira según la
+# carga), su copia se suma a un total de hilos retirados y se suelta, así
+# que la memoria no crece con el número de hilos que han existido. Los
+# indicadores (`Gauge`) solo se tocan desde el bucle de eventos, así que no
+# necesitan nada de esto.
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class _ShardOwner:
+    # Vive en el `threading.local` junto a la copia del hilo: se libera
+    # cuando el hilo termina y eso dispara `_Sharded._retire`
+    __slots__ = ("__weakref__",)
+
+
+class _Sharded(_Metric):
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._retired: dict = {}
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            owner = self._local.owner = _ShardOwner()
+            with self._shards_lock:
+                self._shards.append(shard)
+            weakref.finalize(owner, self._retire, shard).atexit = False
+            return shard
+
+    def _retire(self, shard: dict) -> None:
+        with self._shards_lock:
+            # Por identidad: dos copias pueden tener el mismo contenido
+            for i, live in enumerate(self._shards):
+                if live is shard:
+                    del self._shards[i]
+                    break
+            self._merge(self._retired, shard)
+
+    def _totals(self) -> dict:
+        totals: dict = {}
+        with self._shards_lock:
+            self._merge(totals, self._retired)
+            for shard in self._shards:
+                # Copiar un diccionario es una sola operación en C: no se
+                # ve a medias aunque otro hilo lo esté modificando
+                self._merge(totals, dict(shard))
+        return totals
+
+    def _merge(self, into: dict, shard: dict) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._totals().get(labels, 0)
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, k)} {_number(v)}"
+            for k, v in sorted(self._totals().items())
+        ]
+
+    def _merge(self, into: Dict[Tuple, float], shard: Dict[Tuple, float]) -> None:
+        for key, value in shard.items():
+            into[key] = into.get(key, 0) + value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def set(self, *labels, value: float) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, k)} {_number(v)}"
+            for k, v in sorted(self._values.items())
+        ]
+
+
+# Límites en segundos: de 50 µs a 10 s, suficientes para operaciones del
+# almacén y peticiones completas.
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels) -> None:
+        # Serie: recuentos por cubo (el último es +Inf) y, al final, la suma
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels) -> int:
+        series = self._totals().get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, series in sorted(self._totals().items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series):
+                cumulative += n
+                le = 'le="%s"' % _number(bound)
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+    def _merge(self, into: Dict[Tuple, list], shard: Dict[Tuple, list]) -> None:
+        for key, series in shard.items():
+            total = into.get(key)
+            if total is None:
+                # Copia: la serie del hilo sigue cambiando
+                into[key] = list(series)
+            else:
+                into[key] = [a + b for a, b in zip(total, series)]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (),
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------
+# Métricas de la aplicación
+# ---------------------------------------------------------
+
+registry = Registry()
+
+requests_total = registry.counter(
+    "tasks_http_requests_total", "Peticiones HTTP atendidas.",
+    ("method", "route", "status"),
+)
+request_errors = registry.counter(
+    "tasks_http_request_errors_total",
+    "Peticiones terminadas con un error del servidor (5xx o excepción).",
+    ("method", "route"),
+)
+requests_in_flight = registry.gauge(
+    "tasks_http_requests_in_flight", "Peticiones en curso.",
+)
+request_duration = registry.histogram(
+    "tasks_http_request_duration_seconds",
+    "Latencia de las peticiones por plantilla de ruta.",
+    ("method", "route"),
+)
+# El long-poll y el SSE del feed de cambios duran lo que el cliente espera
+# (segundos o minutos): van en su propia serie para no ocultar la latencia
+# de las demás peticiones.
+STREAM_ROUTES = frozenset(("/tasks/changes", "/tasks/changes/stream"))
+stream_duration = registry.histogram(
+    "tasks_http_stream_duration_seconds",
+    "Duración de las conexiones del feed de cambios (long-poll y SSE).",
+    ("method", "route"),
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+threadpool_wait = registry.histogram(
+    "tasks_threadpool_wait_seconds",
+    "Espera desde que llega la petición hasta que su función síncrona "
+    "empieza en un hilo del pool.",
+    ("route",),
+)
+threadpool_threads = registry.gauge(
+    "tasks_threadpool_threads",
+    "Hilos del pool por estado (busy, capacity) y peticiones esperando (waiting).",
+    ("state",),
+)
+store_gauges = {
+    "tasks": registry.gauge("tasks_store_tasks", "Tareas guardadas."),
+    "memory_bytes": registry.gauge(
+        "tasks_store_memory_bytes",
+        "Tamaño estimado del almacén en bytes (en SQLite, el de la base de datos).",
+    ),
+    "version": registry.gauge("tasks_store_version", "Versión global del almacén."),
+}
+changes_gauges = {
+    "seq": registry.gauge(
+        "tasks_changes_seq", "Último número de secuencia del feed de cambios.",
+    ),
+    "waiting": registry.gauge(
+        "tasks_changes_waiting", "Clientes esperando cambios (long-poll y SSE).",
+    ),
+}
+store_operation = registry.histogram(
+    "tasks_store_operation_seconds",
+    "Duración de las operaciones del backend de almacenamiento.",
+    ("op",),
+)
+
+# Instante de llegada de la petición en curso (se copia a los hilos del
+# pool junto con el resto del contexto)
+_request_start: ContextVar[Optional[float]] = ContextVar("request_start", default=None)
+
+# Rutas que no coinciden con ninguna plantilla: una sola serie para que una
+# ráfaga de URLs distintas no cree una serie por URL
+_UNMATCHED = "unmatched"
+
+
+# ---------------------------------------------------------
+# Middleware ASGI
+# ---------------------------------------------------------
+#
+# Middleware ASGI puro (sin BaseHTTPMiddleware, que añade una tarea y
+# colas por petición). La plantilla de ruta (`/tasks/{id}`) la deja el
+# enrutador en `scope["route"]`, así que se lee al terminar la petición.
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = _request_start.set(start)
+        status = 500
+        started = False
+
+        async def send_with_status(message):
+            nonlocal status, started
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                started = True
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException:
+            # Si la respuesta ya empezó, el cliente recibió su código (por
+            # ejemplo, un SSE que se corta al cerrar la conexión)
+            if not started:
+                status = 500
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            requests_in_flight.dec()
+            _request_start.reset(token)
+
+            route = getattr(scope.get("route"), "path", None) or _UNMATCHED
+            method = scope["method"]
+            requests_total.inc(method, route, status)
+            if route in STREAM_ROUTES:
+                stream_duration.observe(elapsed, method, route)
+            else:
+                request_duration.observe(elapsed, method, route)
+            if status >= 500:
+                request_errors.inc(method, route)
+
+
+# ---------------------------------------------------------
+# Espera en el pool de hilos
+# ---------------------------------------------------------
+#
+# FastAPI ejecuta las rutas síncronas en el pool de hilos de anyio. Esta
+# clase de ruta envuelve la función de cada ruta síncrona para medir cuánto
+# tardó en empezar desde que llegó la petición (sobre todo, la cola del
+# pool cuando todos los hilos están ocupados).
+
+class InstrumentedRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        # `include_router` vuelve a crear las rutas con esta misma clase:
+        # una función ya envuelta no se envuelve otra vez
+        if not _is_async(endpoint) and not hasattr(endpoint, "_metrics_route"):
+            endpoint = _timed_endpoint(endpoint, path)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _is_async(fn: Callable) -> bool:
+    return inspect.iscoroutinefunction(fn) or inspect.isasyncgenfunction(fn)
+
+
+def _timed_endpoint(fn: Callable, route: str) -> Callable:
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = _request_start.get()
+        if start is not None:
+            threadpool_wait.observe(time.perf_counter() - start, route)
+        return fn(*args, **kwargs)
+
+    wrapper._metrics_route = route
+    return wrapper
+
+
+def collect_threadpool() -> None:
+    """Actualiza los indicadores del pool (desde el bucle de eventos)."""
+    from anyio.to_thread import current_default_thread_limiter
+
+    stats = current_default_thread_limiter().statistics()
+    threadpool_threads.set("busy", value=stats.borrowed_tokens)
+    threadpool_threads.set("capacity", value=stats.total_tokens)
+    threadpool_threads.set("waiting", value=stats.tasks_waiting)
+
+
+# ---------------------------------------------------------
+# Tiempos del backend
+# ---------------------------------------------------------
+
+class TimedBackend:
+    """Envuelve un backend y mide la duración de cada operación."""
+
+    _UNTIMED = {"open", "close", "stats", "changes", "get_version"}
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def __getattr__(self, name):
+        attr = getattr(self._backend, name)
+        if name in self._UNTIMED or name.startswith("_") or not callable(attr):
+            return attr
+
+        @wraps(attr)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                store_operation.observe(time.perf_counter() - start, name)
+
+        # Se guarda para no crear el envoltorio en cada llamada
+        setattr(self, name, timed)
+        return timed
+
+
+def collect_changes(feed) -> None:
+    if feed is not None:
+        changes_gauges["seq"].set(value=feed.seq)
+        changes_gauges["waiting"].set(value=feed.waiting)
+
+
+def collect_store(stats: Dict[str, float]) -> None:
+    """Actualiza los indicadores del almacén con `backend.stats()`."""
+    for stat, value in stats.items():
+        gauge = store_gauges.get(stat)
+        if gauge is not None:
+            gauge.set(value=value)
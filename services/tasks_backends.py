@@ -0,0 +1,166 @@
+# services/tasks_backends.py
+#
+# Backends de almacenamiento intercambiables para la capa de servicios.
+
+import os
+import secrets
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from models import tasks_model
+from models.tasks_changes import ChangeFeed
+from models.tasks_model import Task, TaskCreate, TaskUpdate, TaskPatch, TaskBulkPatch
+
+
+# ---------------------------------------------------------
+# Interfaz común
+# ---------------------------------------------------------
+#
+# Mismas operaciones (y mismos nombres) que las funciones CRUD de
+# models/tasks_model.py, más `open`/`close` para el ciclo de vida de la app.
+# Las versiones (global y por tarea) permiten validar ETags y cachés.
+
+# Identifica este arranque del proceso (ver `TaskBackend.epoch`)
+_BOOT_EPOCH = secrets.token_hex(4)
+
+
+class TaskBackend(ABC):
+    def open(self) -> None:
+        pass
+
+    @property
+    def epoch(self) -> str:
+        """Identifica el contador de versiones: cambia cuando las versiones
+        pueden volver a empezar desde cero (p. ej. al reiniciar un almacén
+        en memoria), así que forma parte de los ETags. Por defecto, uno
+        aleatorio por arranque del proceso."""
+        return _BOOT_EPOCH
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, float]:
+        """Indicadores del almacén para /metrics (`tasks`, `memory_bytes`,
+        `version`); cada backend informa los que puede calcular."""
+        return {}
+
+    def changes(self) -> Optional[ChangeFeed]:
+        """Feed de cambios de este proceso; `None` si el backend no lo
+        publica (con varios workers cada uno vería solo sus escrituras)."""
+        return None
+
+    @abstractmethod
+    def get_all_tasks(self) -> List[Task]: ...
+
+    @abstractmethod
+    def query_tasks(
+        self,
+        after: int = 0,
+        limit: Optional[int] = None,
+        done: Optional[bool] = None,
+        prefix: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> Tuple[List[Task], Optional[int]]: ...
+
+    @abstractmethod
+    def get_task_by_id(self, task_id: int) -> Optional[Task]: ...
+
+    @abstractmethod
+    def get_task_versioned(self, task_id: int) -> Tuple[Optional[Task], int]: ...
+
+    @abstractmethod
+    def get_version(self) -> int:
+        """Contador global que cambia con cada escritura."""
+
+    @abstractmethod
+    def create_task(self, data: TaskCreate) -> Task: ...
+
+    @abstractmethod
+    def update_task(self, task_id: int, data: TaskUpdate) -> Optional[Task]: ...
+
+    @abstractmethod
+    def patch_task(self, task_id: int, data: TaskPatch) -> Optional[Task]: ...
+
+    @abstractmethod
+    def delete_task(self, task_id: int) -> bool: ...
+
+    @abstractmethod
+    def create_tasks(self, items: List[TaskCreate]) -> List[Task]: ...
+
+    @abstractmethod
+    def patch_tasks(self, items: List[TaskBulkPatch]) -> List[Optional[Task]]: ...
+
+    @abstractmethod
+    def delete_tasks(self, task_ids: List[int]) -> List[bool]: ...
+
+
+# ---------------------------------------------------------
+# Backend en memoria (por defecto)
+# ---------------------------------------------------------
+#
+# Usa el almacén de models/tasks_model.py. Cada proceso tiene el suyo, así
+# que solo sirve con un único worker de uvicorn.
+
+class MemoryBackend(TaskBackend):
+    def open(self) -> None:
+        tasks_model.open_storage()
+
+    def close(self) -> None:
+        tasks_model.close_storage()
+
+    def get_all_tasks(self):
+        return tasks_model.get_all_tasks()
+
+    def query_tasks(self, after=0, limit=None, done=None, prefix=None, search=None):
+        return tasks_model.query_tasks(after, limit, done=done, prefix=prefix, search=search)
+
+    def get_task_by_id(self, task_id):
+        return tasks_model.get_task_by_id(task_id)
+
+    def get_task_versioned(self, task_id):
+        return tasks_model.get_task_versioned(task_id)
+
+    def get_version(self):
+        return tasks_model.get_version()
+
+    def stats(self):
+        return tasks_model.store_stats()
+
+    def changes(self):
+        return tasks_model.changes
+
+    def create_task(self, data):
+        return tasks_model.create_task(data)
+
+    def update_task(self, task_id, data):
+        return tasks_model.update_task(task_id, data)
+
+    def patch_task(self, task_id, data):
+        return tasks_model.patch_task(task_id, data)
+
+    def delete_task(self, task_id):
+        return tasks_model.delete_task(task_id)
+
+    def create_tasks(self, items):
+        return tasks_model.create_tasks(items)
+
+    def patch_tasks(self, items):
+        return tasks_model.patch_tasks(items)
+
+    def delete_tasks(self, task_ids):
+        return tasks_model.delete_tasks(task_ids)
+
+
+def backend_from_env() -> TaskBackend:
+    """Elige el backend con TASKS_BACKEND (`memory` o `sqlite`)."""
+    name = os.environ.get("TASKS_BACKEND", "memory")
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        from services.tasks_sqlite import SQLiteBackend
+
+        return SQLiteBackend(
+            os.environ.get("TASKS_SQLITE_PATH", "tasks.db"),
+            pool_size=int(os.environ.get("TASKS_SQLITE_POOL", "8")),
+        )
+    raise ValueError(f"TASKS_BACKEND desconocido: {name!r}")
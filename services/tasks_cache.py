@@ -0,0 +1,70 @@
+# services/tasks_cache.py
+#
+# Caché de respuestas ya serializadas, validada por versión.
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: bytes
+    next_cursor: Optional[int] = None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Si la cabecera If-None-Match del cliente incluye `etag`."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+# ---------------------------------------------------------
+# Caché LRU acotada
+# ---------------------------------------------------------
+#
+# Cada entrada guarda la versión con la que se generó. Una entrada cuya
+# versión no coincide con la actual se considera inválida, así que no hace
+# falta borrar nada al escribir: basta con que la versión avance.
+#
+# Está acotada por número de entradas (`maxsize`) y por el tamaño total de
+# los cuerpos (`maxbytes`): sin el segundo límite, unas pocas páginas
+# grandes (p. ej. `limit` alto o la lista completa) podrían ocupar
+# gigabytes. Un cuerpo mayor que `maxbytes` no se guarda.
+
+class ResponseCache:
+    def __init__(self, maxsize: int = 4096, maxbytes: int = 64 * 2**20):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: int) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, version: int, response: CachedResponse) -> None:
+        size = len(response.body)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old[1].body)
+            if size > self.maxbytes:
+                return
+            self._entries[key] = (version, response)
+            self.nbytes += size
+            while len(self._entries) > self.maxsize or self.nbytes > self.maxbytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted.body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
@@ -1,18 +1,47 @@
 # services/tasks_service.py
 
-from typing import List, Optional
+import os
+import zlib
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from pydantic import TypeAdapter
 from models.tasks_model import (
     Task,
     TaskCreate,
     TaskUpdate,
     TaskPatch,
-    get_all_tasks,
-    get_task_by_id,
-    create_task,
-    update_task,
-    patch_task,
-    delete_task,
+    TaskBulkPatch,
+    BulkResult,
 )
+from models.tasks_changes import ChangeBatch, ChangeFeed
+from services import metrics
+from services.tasks_backends import TaskBackend, backend_from_env
+from services.tasks_cache import CachedResponse, ResponseCache, etag_matches
+
+
+# ---------------------------------------------------------
+# Backend de almacenamiento
+# ---------------------------------------------------------
+#
+# Se elige con TASKS_BACKEND (ver services/tasks_backends.py): `memory`
+# (por defecto, un almacén por proceso) o `sqlite` (compartido entre los
+# workers de uvicorn).
+
+backend: TaskBackend = backend_from_env()
+if metrics.enabled:
+    # Mide la duración de cada operación del backend
+    backend = metrics.TimedBackend(backend)
+
+
+def service_open() -> None:
+    backend.open()
+
+
+def service_close() -> None:
+    backend.close()
+
+
+def service_store_stats() -> dict:
+    return backend.stats()
 
 
 # ---------------------------------------------------------
@@ -20,27 +49,210 @@ from models.tasks_model import (
 # ---------------------------------------------------------
 
 def service_list_tasks() -> List[Task]:
-    return get_all_tasks()
+    return backend.get_all_tasks()
+
+
+def service_query_tasks(
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    done: Optional[bool] = None,
+    prefix: Optional[str] = None,
+    search: Optional[str] = None,
+) -> Tuple[List[Task], Optional[int]]:
+    return backend.query_tasks(cursor or 0, limit, done=done, prefix=prefix, search=search)
+
+
+# ---------------------------------------------------------
+# Respuestas cacheadas con ETag
+# ---------------------------------------------------------
+#
+# Las lecturas se sirven como bytes ya serializados. La caché se valida con
+# la versión del backend (global para listados, de la tarea para GET por
+# id), así que una consulta repetida sin cambios cuesta una búsqueda en un
+# diccionario en lugar de una serialización completa.
+#
+# Los ETags llevan además la época del backend: tras un reinicio del
+# almacén en memoria las versiones vuelven a empezar, y sin ella un ETag
+# guardado por un cliente podría coincidir con datos distintos.
+#
+# El ETag de un listado solo depende de la época, la versión y los
+# parámetros, así que se calcula antes de consultar: si coincide con el
+# If-None-Match del cliente se responde 304 sin leer ni serializar nada,
+# aunque el cuerpo no esté en la caché (p. ej. por superar su tamaño).
+
+response_cache = ResponseCache(
+    int(os.environ.get("TASKS_CACHE_SIZE", "4096")),
+    int(os.environ.get("TASKS_CACHE_BYTES", str(64 * 2**20))),
+)
+_task_list_adapter = TypeAdapter(List[Task])
+
+
+def service_list_tasks_cached(
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    done: Optional[bool] = None,
+    prefix: Optional[str] = None,
+    search: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+) -> CachedResponse:
+    """Listado serializado con su ETag. Si `if_none_match` ya coincide y no
+    está en la caché, devuelve solo el ETag (sin cuerpo ni cursor): el
+    cliente conserva los de la respuesta que validó."""
+    key = ("list", cursor, limit, done, prefix, search)
+    version = backend.get_version()
+    cached = response_cache.get(key, version)
+    if cached is not None:
+        return cached
+    etag = '"%s-l%d-%08x"' % (backend.epoch, version, zlib.crc32(repr(key).encode()))
+    if etag_matches(if_none_match, etag):
+        return CachedResponse(etag, b"")
+
+    if key[1:] == (None,) * 5:
+        tasks, next_cursor = service_list_tasks(), None
+    else:
+        tasks, next_cursor = service_query_tasks(
+            cursor, limit, done=done, prefix=prefix, search=search
+        )
+    response = CachedResponse(etag, _task_list_adapter.dump_json(tasks), next_cursor)
+    response_cache.put(key, version, response)
+    return response
+
+
+def service_get_task_cached(task_id: int) -> Optional[CachedResponse]:
+    task, version = backend.get_task_versioned(task_id)
+    if task is None:
+        return None
+
+    key = ("task", task_id)
+    cached = response_cache.get(key, version)
+    if cached is not None:
+        return cached
+
+    etag = '"%s-t%d-%d"' % (backend.epoch, task_id, version)
+    response = CachedResponse(etag, task.model_dump_json().encode())
+    response_cache.put(key, version, response)
+    return response
+
+
+def service_export_tasks(
+    after: int = 0,
+    chunk_size: int = 1000,
+) -> Iterator[bytes]:
+    """Genera las tareas con id mayor que `after` en formato NDJSON.
+
+    Se leen del almacén por páginas de `chunk_size` tareas y cada página se
+    emite como un único bloque de bytes, así que la memoria usada no depende
+    del número total de tareas.
+    """
+    while True:
+        tasks, next_cursor = backend.query_tasks(after, chunk_size)
+        if tasks:
+            yield b"".join(t.model_dump_json().encode() + b"\n" for t in tasks)
+        if next_cursor is None:
+            return
+        after = next_cursor
+
+
+# ---------------------------------------------------------
+# Feed de cambios (long-poll y SSE)
+# ---------------------------------------------------------
+#
+# Los cuerpos se arman con el JSON ya serializado de cada evento, que se
+# comparte entre todos los clientes.
+
+def service_changes_feed() -> Optional[ChangeFeed]:
+    return backend.changes()
+
+
+def _changes_body(batch: ChangeBatch) -> bytes:
+    return b'{"events":[%s],"next":"%s","reset":%s}' % (
+        b",".join(e.json() for e in batch.events),
+        batch.next.encode(),
+        b"true" if batch.reset else b"false",
+    )
+
+
+async def service_wait_changes(
+    since: Optional[str] = None,
+    timeout: float = 30.0,
+    limit: int = 1000,
+) -> Optional[bytes]:
+    """Cambios posteriores a `since` en JSON, esperando hasta `timeout`
+    segundos si todavía no hay ninguno; `None` si el backend no tiene feed."""
+    feed = backend.changes()
+    if feed is None:
+        return None
+    return _changes_body(await feed.wait(since, timeout, limit))
+
+
+async def service_stream_changes(
+    since: Optional[str] = None,
+    heartbeat: float = 15.0,
+) -> AsyncIterator[bytes]:
+    """Cambios como Server-Sent Events, empezando después de `since`.
+
+    Cada evento lleva `id` (su cursor, que el navegador reenvía como
+    Last-Event-ID al reconectar), `event` (la operación) y
+    `data` (el mismo JSON que el long-poll). Si el cliente se perdió
+    cambios se envía un evento `reset`; sin cambios, un comentario cada
+    `heartbeat` segundos mantiene viva la conexión.
+    """
+    feed = backend.changes()
+    while True:
+        batch = await feed.wait(since, heartbeat)
+        if batch.reset:
+            yield b"event: reset\ndata: %s\n\n" % batch.next.encode()
+        elif batch.events:
+            epoch = feed.epoch.encode()
+            yield b"".join(
+                b"id: %s:%d\nevent: %s\ndata: %s\n\n" % (epoch, e.seq, e.op.encode(), e.json())
+                for e in batch.events
+            )
+        else:
+            yield b": ping\n\n"
+        since = batch.next
 
 
 def service_get_task(task_id: int) -> Optional[Task]:
-    return get_task_by_id(task_id)
+    return backend.get_task_by_id(task_id)
 
 
 def service_create_task(data: TaskCreate) -> Task:
-    return create_task(data)
+    return backend.create_task(data)
 
 
 def service_update_task(task_id: int, data: TaskUpdate) -> Optional[Task]:
-    return update_task(task_id, data)
+    return backend.update_task(task_id, data)
 
 
 def service_patch_task(task_id: int, data: TaskPatch) -> Optional[Task]:
-    return patch_task(task_id, data)
+    return backend.patch_task(task_id, data)
 
 
 def service_delete_task(task_id: int) -> bool:
-    return delete_task(task_id)
+    return backend.delete_task(task_id)
+
+
+def service_create_tasks(items: List[TaskCreate]) -> List[Task]:
+    return backend.create_tasks(items)
+
+
+def service_patch_tasks(items: List[TaskBulkPatch]) -> List[BulkResult]:
+    results = []
+    for item, task in zip(items, backend.patch_tasks(items)):
+        if task is None:
+            results.append(BulkResult(id=item.id, status=404, error="Not found"))
+        else:
+            results.append(BulkResult(id=item.id, status=200, task=task))
+    return results
+
+
+def service_delete_tasks(task_ids: List[int]) -> List[BulkResult]:
+    return [
+        BulkResult(id=task_id, status=204) if ok
+        else BulkResult(id=task_id, status=404, error="Not found")
+        for task_id, ok in zip(task_ids, backend.delete_tasks(task_ids))
+    ]
 
 if __name__ == "__main__":
     print("== Prueba de capa de servicios ==")
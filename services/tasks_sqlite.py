@@ -0,0 +1,303 @@
+# services/tasks_sqlite.py
+#
+# Backend compartido entre procesos sobre un fichero SQLite en modo WAL.
+
+import queue
+import sqlite3
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+from models.tasks_model import Task
+from services.tasks_backends import TaskBackend
+
+
+# ---------------------------------------------------------
+# Backend SQLite
+# ---------------------------------------------------------
+#
+# Pensado para `uvicorn main:app --workers N`: todos los workers abren el
+# mismo fichero, así que ven las mismas tareas.
+#
+#   - journal_mode=WAL: los lectores no bloquean al escritor ni al revés;
+#     las escrituras de distintos procesos se serializan en SQLite.
+#   - synchronous=NORMAL: en modo WAL no se corrompe la base ante caídas y
+#     evita un fsync por transacción.
+#   - Cada proceso mantiene un pool de conexiones reutilizables (las rutas
+#     se ejecutan en un pool de hilos).
+#   - AUTOINCREMENT garantiza que los ids no se reutilizan, igual que en
+#     memoria; los lotes reservan un rango de ids en una sola transacción.
+#   - Cada transacción de escritura incrementa la versión global (tabla
+#     `task_meta`) y la guarda en las filas que modifica, así las versiones
+#     son coherentes entre todos los workers. La época de los ETags también
+#     se guarda ahí al crear la base: es la misma para todos los workers y
+#     solo cambia si la base se vuelve a crear.
+#
+# `prefix` y `search` comparan sin distinguir mayúsculas igual que el
+# almacén en memoria (`str.casefold`, no solo ASCII como NOCASE y LIKE):
+# cada fila guarda su título ya normalizado en `title_key`, y se consulta
+# con LIKE y el patrón también normalizado. La columna es NOCASE para que
+# SQLite pueda resolver el prefijo con su índice. Las búsquedas por
+# subcadena (`search`) recorren la tabla; el resto de filtros usan índices.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    title     TEXT    NOT NULL,
+    title_key TEXT    NOT NULL COLLATE NOCASE,
+    done      INTEGER NOT NULL DEFAULT 0,
+    version   INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tasks_done_id ON tasks (done, id);
+DROP INDEX IF EXISTS tasks_title;
+CREATE INDEX IF NOT EXISTS tasks_title_key ON tasks (title_key);
+CREATE TABLE IF NOT EXISTS task_meta (
+    k TEXT PRIMARY KEY,
+    v INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO task_meta (k, v) VALUES ('version', 0);
+INSERT OR IGNORE INTO task_meta (k, v) VALUES ('epoch', abs(random() % 4294967296));
+"""
+
+
+def _like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _row_to_task(row) -> Task:
+    return Task(id=row[0], title=row[1], done=bool(row[2]))
+
+
+class SQLiteBackend(TaskBackend):
+    def __init__(self, path: str, pool_size: int = 8, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._epoch = ""
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = queue.Queue()
+        for _ in range(pool_size):
+            self._slots.put(None)
+
+    # -----------------------------------------------------
+    # Conexiones
+    # -----------------------------------------------------
+
+    def open(self) -> None:
+        with self._conn() as conn:
+            # Varios workers arrancan a la vez: la migración va en una
+            # transacción de escritura y vuelve a mirar las columnas dentro
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._migrate(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            conn.executescript(_SCHEMA)
+            self._epoch = "%08x" % conn.execute(
+                "SELECT v FROM task_meta WHERE k = 'epoch'"
+            ).fetchone()[0]
+
+    @property
+    def epoch(self) -> str:
+        return self._epoch
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        columns = [r[1] for r in conn.execute("PRAGMA table_info(tasks)")]
+        if not columns:
+            return
+        if "version" not in columns:
+            # Base creada antes de existir las versiones
+            conn.execute(
+                "ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+            )
+        if "title_key" not in columns:
+            # Base creada antes de normalizar los títulos
+            conn.execute(
+                "ALTER TABLE tasks ADD COLUMN title_key TEXT NOT NULL DEFAULT '' COLLATE NOCASE"
+            )
+            conn.executemany(
+                "UPDATE tasks SET title_key = ? WHERE id = ?",
+                [(title.casefold(), task_id)
+                 for task_id, title in conn.execute("SELECT id, title FROM tasks")],
+            )
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: las transacciones se abren explícitamente
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    @contextmanager
+    def _conn(self):
+        # Como mucho `pool_size` conexiones en uso a la vez por proceso
+        self._slots.get()
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+            self._slots.put(None)
+
+    @contextmanager
+    def _write(self):
+        """Transacción de escritura; entrega `(conexión, nueva versión)`."""
+        # BEGIN IMMEDIATE toma el cerrojo de escritura al empezar, evitando
+        # fallos por conflicto al promover una lectura a escritura.
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = conn.execute(
+                    "UPDATE task_meta SET v = v + 1 WHERE k = 'version' RETURNING v"
+                ).fetchone()[0]
+                yield conn, version
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    # -----------------------------------------------------
+    # Lecturas
+    # -----------------------------------------------------
+
+    def get_all_tasks(self) -> List[Task]:
+        with self._conn() as conn:
+            rows = conn.execute("SELECT id, title, done FROM tasks ORDER BY id").fetchall()
+        return [_row_to_task(r) for r in rows]
+
+    def query_tasks(
+        self,
+        after: int = 0,
+        limit: Optional[int] = None,
+        done: Optional[bool] = None,
+        prefix: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> Tuple[List[Task], Optional[int]]:
+        sql = ["SELECT id, title, done FROM tasks WHERE id > ?"]
+        params: list = [after]
+        if done is not None:
+            sql.append("AND done = ?")
+            params.append(int(done))
+        if prefix:
+            sql.append("AND title_key LIKE ? ESCAPE '\\'")
+            params.append(_like_escape(prefix.casefold()) + "%")
+        if search:
+            sql.append("AND title_key LIKE ? ESCAPE '\\'")
+            params.append("%" + _like_escape(search.casefold()) + "%")
+        sql.append("ORDER BY id")
+        if limit is not None:
+            # Una fila de más para saber si hay página siguiente
+            sql.append("LIMIT ?")
+            params.append(limit + 1)
+
+        with self._conn() as conn:
+            rows = conn.execute(" ".join(sql), params).fetchall()
+        tasks = [_row_to_task(r) for r in rows[:limit]]
+        if limit is not None and len(rows) > limit:
+            return tasks, tasks[-1].id
+        return tasks, None
+
+    def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        return self.get_task_versioned(task_id)[0]
+
+    def get_task_versioned(self, task_id: int) -> Tuple[Optional[Task], int]:
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT id, title, done, version FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        if row is None:
+            return None, 0
+        return _row_to_task(row), row[3]
+
+    def get_version(self) -> int:
+        with self._conn() as conn:
+            return conn.execute("SELECT v FROM task_meta WHERE k = 'version'").fetchone()[0]
+
+    def stats(self):
+        with self._conn() as conn:
+            pages = conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            return {
+                "tasks": conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0],
+                "memory_bytes": pages * page_size,
+                "version": conn.execute(
+                    "SELECT v FROM task_meta WHERE k = 'version'"
+                ).fetchone()[0],
+            }
+
+    # -----------------------------------------------------
+    # Escrituras
+    # -----------------------------------------------------
+
+    def create_task(self, data):
+        return self.create_tasks([data])[0]
+
+    def update_task(self, task_id, data):
+        with self._write() as (conn, version):
+            return self._update(conn, version, task_id, data.title, data.done)
+
+    def patch_task(self, task_id, data):
+        with self._write() as (conn, version):
+            return self._update(conn, version, task_id, data.title, data.done)
+
+    def delete_task(self, task_id):
+        return self.delete_tasks([task_id])[0]
+
+    def create_tasks(self, items):
+        with self._write() as (conn, version):
+            row = conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'tasks'"
+            ).fetchone()
+            first_id = (row[0] if row else 0) + 1
+            rows = [
+                (task_id, item.title, int(item.done), version, item.title.casefold())
+                for task_id, item in enumerate(items, first_id)
+            ]
+            conn.executemany(
+                "INSERT INTO tasks (id, title, done, version, title_key) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return [_row_to_task(r) for r in rows]
+
+    def patch_tasks(self, items):
+        with self._write() as (conn, version):
+            return [
+                self._update(conn, version, item.id, item.title, item.done)
+                for item in items
+            ]
+
+    def delete_tasks(self, task_ids):
+        with self._write() as (conn, _):
+            return [
+                conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount > 0
+                for task_id in task_ids
+            ]
+
+    @staticmethod
+    def _update(conn, version, task_id, title, done) -> Optional[Task]:
+        row = conn.execute(
+            "UPDATE tasks SET title = coalesce(?, title), "
+            "title_key = coalesce(?, title_key), done = coalesce(?, done), "
+            "version = ? WHERE id = ? RETURNING id, title, done",
+            (
+                title,
+                None if title is None else title.casefold(),
+                None if done is None else int(done),
+                version,
+                task_id,
+            ),
+        ).fetchone()
+        return None if row is None else _row_to_task(row)